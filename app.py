@@ -1,12 +1,17 @@
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import uvicorn
 from orchestrator import ChatbotOrchestrator
+from config import Config
+from typing import Optional
+import argparse
 import json
 import logging
 import asyncio
+import uuid
+import os
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +25,32 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Store chatbot instance
 chatbot_instance = None
 
+# Chat turns this worker cancelled because the client sent a newer message
+# or went away before the answer was ready
+connection_stats = {'superseded': 0, 'disconnected': 0}
+
 class InitializeRequest(BaseModel):
     website_url: str
     force_scrape: bool = False
 
+def load_published_index() -> bool:
+    """Serve from the configured bundle, or the index published by any worker or an earlier build."""
+    global chatbot_instance
+    orchestrator = ChatbotOrchestrator(Config.WEBSITE_URL)
+    if os.getenv('SERVE_BUNDLE'):
+        orchestrator.load_bundle(os.getenv('SERVE_BUNDLE'))
+    elif not orchestrator.load_index():
+        logger.warning("No published index yet; waiting for /initialize")
+        return False
+    chatbot_instance = orchestrator
+    return True
+
+@app.on_event("startup")
+async def startup():
+    # In serving mode every worker opens the shared index read-only at startup
+    if os.getenv('SERVE_FROM_INDEX'):
+        load_published_index()
+
 @app.get("/")
 async def read_root():
     return FileResponse("static/index.html")
@@ -43,6 +70,13 @@ async def initialize_chatbot(request: InitializeRequest):
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
+    # Sessions are keyed by a client supplied id so any worker can serve them
+    session_id = websocket.query_params.get('session_id') or uuid.uuid4().hex
+    
+    if not chatbot_instance and os.getenv('SERVE_FROM_INDEX'):
+        # Another worker may have published an index since startup
+        load_published_index()
+    
     if not chatbot_instance:
         await websocket.send_json({
             "error": "Chatbot not initialized"
@@ -50,19 +84,62 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close()
         return
 
+    async def answer(message: str) -> None:
+        response = await chatbot_instance.chat(message, session_id)
+        try:
+            await websocket.send_json(response)
+        except Exception as e:
+            logger.error(f"Could not send response: {e}")
+    
+    # At most one turn runs per connection; a new message supersedes it
+    turn: Optional[asyncio.Task] = None
     try:
         while True:
             message = await websocket.receive_text()
             
-            # Get chatbot response
-            response = await chatbot_instance.chat(message)
-            
-            # Send response back to client
-            await websocket.send_json(response)
+            if turn and not turn.done():
+                turn.cancel()
+                connection_stats['superseded'] += 1
+                # Tell the client the earlier question will get no answer
+                await websocket.send_json({"cancelled": True})
+            turn = asyncio.create_task(answer(message))
             
+    except WebSocketDisconnect:
+        # Nobody is left to read the answer
+        if turn and not turn.done():
+            turn.cancel()
+            connection_stats['disconnected'] += 1
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+        if turn and not turn.done():
+            turn.cancel()
         await websocket.close()
 
+@app.get("/metrics")
+async def metrics():
+    """Counters for this worker process."""
+    return {
+        "pid": os.getpid(),
+        "connections": connection_stats,
+        "chat": chatbot_instance.stats if chatbot_instance else {},
+    }
+
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Website Chatbot server')
+    parser.add_argument('--host', type=str, default='0.0.0.0', help='Host to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    parser.add_argument('--serve', action='store_true',
+                        help='Production mode: serve the published index, no auto-reload')
+    parser.add_argument('--bundle', type=str, metavar='PATH',
+                        help='Serve from a prebuilt site bundle (implies --serve)')
+    args = parser.parse_args()
+    
+    if args.bundle:
+        os.environ['SERVE_BUNDLE'] = os.path.abspath(args.bundle)
+    
+    if args.serve or args.bundle or args.workers > 1:
+        os.environ['SERVE_FROM_INDEX'] = '1'
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run("app:app", host=args.host, port=args.port, reload=True)
@@ -0,0 +1,161 @@
+"""
+Benchmark page extraction: the previous BeautifulSoup/html.parser implementation
+against html_extraction.extract_page_content.
+
+The repo keeps the scraped pages as web_scraping_results.json rather than raw
+HTML, so each saved page is rendered back into a WordPress-like document (head
+meta tags, header/menu, nested content wrappers, sidebar, footer, scripts)
+before being fed to both extractors. Outputs must match exactly.
+
+Usage:
+python benchmark_extraction.py [--repeat 20] [--workers 4]
+"""
+from bs4 import BeautifulSoup
+from html import escape
+from html_extraction import extract_page_content, extract_many
+from typing import List, Dict, Tuple
+import argparse
+import json
+import re
+import time
+
+def legacy_extract_page_content(html: str, url: str, title: str) -> Dict:
+    """The extraction logic previously in WebScrapingAgent._extract_page_content."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for element in soup.select('script, style, iframe, nav, footer, .header, .footer, .navigation, .menu, .sidebar'):
+        element.decompose()
+
+    structured_content = {
+        'url': url,
+        'title': title,
+        'headings': [],
+        'main_content': '',
+        'metadata': {}
+    }
+
+    for heading in soup.find_all(['h1', 'h2', 'h3']):
+        if heading.text.strip():
+            structured_content['headings'].append({
+                'level': heading.name,
+                'text': heading.text.strip()
+            })
+
+    main_content = None
+    content_selectors = [
+        'main',
+        'article',
+        '[role="main"]',
+        '.main-content',
+        '#main-content',
+        '.content',
+        '#content'
+    ]
+
+    for selector in content_selectors:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+
+    if not main_content:
+        main_content = soup.find('body')
+
+    if main_content:
+        for element in main_content.find_all():
+            if len(element.get_text(strip=True)) == 0:
+                element.decompose()
+
+        text = main_content.get_text(separator='\n', strip=True)
+        text = re.sub(r'\n\s*\n', '\n', text)
+        structured_content['main_content'] = text
+
+    meta_tags = soup.find_all('meta')
+    for tag in meta_tags:
+        name = tag.get('name', tag.get('property', ''))
+        content = tag.get('content', '')
+        if name and content:
+            structured_content['metadata'][name] = content
+
+    return structured_content
+
+def _wrap(inner: str, depth: int) -> str:
+    """Nest content in builder-style wrapper divs with empty spacers."""
+    for level in range(depth):
+        inner = (f'<div class="elementor-widget-wrap level-{level}">'
+                 f'<div class="spacer"> </div>{inner}<span></span></div>')
+    return inner
+
+def render_page(item: Dict) -> str:
+    """Render a saved page back into a full HTML document."""
+    meta = ''.join(
+        f'<meta {"property" if ":" in key else "name"}="{escape(key)}" content="{escape(str(value))}">'
+        for key, value in item.get('metadata', {}).items()
+    )
+    headings = ''.join(
+        _wrap(f'<{h["level"]} class="elementor-heading-title"><span>{escape(h["text"])}</span></{h["level"]}>', 4)
+        for h in item.get('headings', [])
+    )
+    paragraphs = ''.join(
+        _wrap(f'<p>{escape(line)} <!-- block --><strong></strong></p>', 6)
+        for line in item.get('main_content', '').split('\n')
+    )
+    menu = ''.join(f'<li class="menu-item"><a href="/p{i}/">Item {i}</a></li>' for i in range(30))
+    return f"""<!DOCTYPE html>
+<html lang="en-US">
+<head>
+<title>{escape(item.get('title', ''))}</title>
+{meta}
+<style>body {{ margin: 0; }}</style>
+<script>window.dataLayer = window.dataLayer || [];</script>
+</head>
+<body class="page-template">
+<div class="header"><nav class="navigation"><ul class="menu">{menu}</ul></nav></div>
+<div id="content" class="site-content">
+<main id="main" class="site-main">
+{headings}
+{paragraphs}
+</main>
+<aside class="sidebar"><h3>Recent Posts</h3><p>Sidebar text</p></aside>
+</div>
+<footer class="footer"><p>Copyright</p><script>trackPageView();</script></footer>
+<iframe src="https://www.youtube.com/embed/x"></iframe>
+</body>
+</html>"""
+
+def load_fixtures(path: str = 'web_scraping_results.json') -> List[Tuple[str, str, str]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    return [(render_page(item), item['url'], item.get('title', '')) for item in items]
+
+def _measure(label: str, run, pages: int) -> float:
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    rate = pages / elapsed
+    print(f"{label:<28} {pages:>6} pages  {elapsed:8.3f}s  {rate:10.1f} pages/sec")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML extraction')
+    parser.add_argument('--repeat', type=int, default=20, help='Times to repeat the fixture set')
+    parser.add_argument('--workers', type=int, default=4, help='Process pool size for the parallel run')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+
+    # Outputs must be identical before any timing is reported
+    for html, url, title in fixtures:
+        expected = legacy_extract_page_content(html, url, title)
+        actual = extract_page_content(html, url, title)
+        if expected != actual:
+            raise SystemExit(f"Extraction output differs for {url}")
+    print(f"Identical output on {len(fixtures)} fixtures")
+
+    pages = fixtures * args.repeat
+    before = _measure('html.parser (before)', lambda: [legacy_extract_page_content(*p) for p in pages], len(pages))
+    after = _measure('lxml single pass (after)', lambda: [extract_page_content(*p) for p in pages], len(pages))
+    pooled = _measure(f'lxml, {args.workers} processes', lambda: extract_many(pages, args.workers), len(pages))
+    print(f"Speedup: {after / before:.1f}x serial, {pooled / before:.1f}x with process pool")
+
+if __name__ == "__main__":
+    main()
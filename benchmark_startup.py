@@ -0,0 +1,103 @@
+"""
+Benchmark process startup for serving: import time, orchestrator construction
+time and peak RSS, each measured in a fresh interpreter. Fails (exit code 1)
+if the serving path imports the scraping/OCR stack or exceeds a time budget,
+so regressions are caught.
+
+Usage:
+python benchmark_startup.py [--runs 5] [--bundle PATH] [--max-import-ms 0] [--max-startup-ms 0]
+
+Without --bundle the published index under ./data/vector_index is served;
+the benchmark fails if there is none.
+"""
+from typing import Dict, List
+import argparse
+import subprocess
+import json
+import sys
+import os
+
+# Modules that only a crawl (or the first translation) needs; none may be
+# loaded by the time a serving process is ready
+CRAWL_ONLY_MODULES = [
+    'playwright', 'PIL', 'pytesseract', 'bs4', 'trafilatura', 'lxml',
+    'scraping_agents', 'html_extraction', 'page_loading', 'sitemap_discovery',
+    'deep_translator'
+]
+
+CHILD_SCRIPT = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import orchestrator
+imported = time.perf_counter()
+from shared_store import MemoryStore
+instance = orchestrator.ChatbotOrchestrator(os.environ.get('BASE_URL', 'https://example.com'), store=MemoryStore())
+if os.environ.get('BENCHMARK_BUNDLE'):
+    instance.load_bundle(os.environ['BENCHMARK_BUNDLE'])
+elif not instance.load_index():
+    # Without an index nothing is mapped and no chatbot is built, so the
+    # timing would not be a serving startup
+    print(json.dumps({'error': 'no published index'}))
+    sys.exit(2)
+ready = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'startup_ms': (ready - start) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'crawl_modules': sorted(name for name in %r if name in sys.modules),
+}))
+"""
+
+def run_once(bundle: str = None) -> Dict:
+    env = dict(os.environ)
+    # Client construction only validates that a key is present
+    env.setdefault('OPENAI_API_KEY', 'benchmark')
+    if bundle:
+        env['BENCHMARK_BUNDLE'] = bundle
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT % (CRAWL_ONLY_MODULES,)],
+        capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode == 2:
+        raise SystemExit("FAIL: no published index to serve; build one first "
+                         "(python main.py --url ...) or pass --bundle PATH")
+    if result.returncode != 0:
+        raise SystemExit(f"Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serving startup')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+    parser.add_argument('--bundle', type=str, help='Measure startup from this site bundle')
+    parser.add_argument('--max-import-ms', type=float, default=0, help='Fail above this median import time')
+    parser.add_argument('--max-startup-ms', type=float, default=0, help='Fail above this median startup time')
+    args = parser.parse_args()
+
+    runs = [run_once(args.bundle) for _ in range(args.runs)]
+    import_ms = _median([r['import_ms'] for r in runs])
+    startup_ms = _median([r['startup_ms'] for r in runs])
+    rss_mb = _median([r['max_rss_mb'] for r in runs])
+    crawl_modules = sorted({name for r in runs for name in r['crawl_modules']})
+
+    print(f"import orchestrator   {import_ms:8.1f} ms (median of {args.runs})")
+    print(f"ready to serve        {startup_ms:8.1f} ms")
+    print(f"peak RSS              {rss_mb:8.1f} MB")
+    print(f"crawl-only modules    {', '.join(crawl_modules) or 'none'}")
+
+    failures = []
+    if crawl_modules:
+        failures.append(f"serving path imported crawl-only modules: {', '.join(crawl_modules)}")
+    if args.max_import_ms and import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:.1f} ms exceeds {args.max_import_ms} ms")
+    if args.max_startup_ms and startup_ms > args.max_startup_ms:
+        failures.append(f"startup time {startup_ms:.1f} ms exceeds {args.max_startup_ms} ms")
+    if failures:
+        raise SystemExit("FAIL: " + "; ".join(failures))
+
+if __name__ == "__main__":
+    main()
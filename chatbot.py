@@ -1,10 +1,7 @@
 from langchain.chat_models import ChatOpenAI
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-from typing import Dict, List
+from typing import Dict, List, Tuple, Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -12,11 +9,8 @@ logger = logging.getLogger(__name__)
 
 class WebsiteChatbot:
     def __init__(self, vectorstore):
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="answer"
-        )
+        # Conversation history is passed in per call so sessions can live in a
+        # store shared by all serving workers
         
         # Create base retriever with better search parameters
         base_retriever = vectorstore.as_retriever(
@@ -47,29 +41,35 @@ class WebsiteChatbot:
         3. Be professional and accurate
         4. If details are missing, acknowledge it
         5. For medical conditions, stick to describing what's in the context
+        6. Write the whole answer in {answer_language}, even if the context is in English
 
         Assistant:"""
         
         self.qa_prompt = PromptTemplate(
             template=self.qa_template,
-            input_variables=["context", "chat_history", "question"]
+            input_variables=["context", "chat_history", "question", "answer_language"]
         )
         
         # Initialize the chain with improved settings
         self.chain = ConversationalRetrievalChain.from_llm(
             llm=ChatOpenAI(temperature=0.7, model="gpt-3.5-turbo-16k"),
             retriever=base_retriever,
-            memory=self.memory,
             combine_docs_chain_kwargs={"prompt": self.qa_prompt},
             return_source_documents=True,
             verbose=True
         )
 
-    async def get_response(self, query: str) -> Dict:
-        """Get a response from the chatbot for the given query."""
+    async def get_response(self, query: str, chat_history: Optional[List[Tuple[str, str]]] = None,
+                           answer_language: str = "English") -> Dict:
+        """Get a response from the chatbot for the given query and (question, answer) history."""
         try:
-            # Get response
-            response = self.chain({"question": query})
+            # Async call so that cancelling the turn also cancels the
+            # outbound retrieval and LLM requests
+            response = await self.chain.acall({
+                "question": query,
+                "chat_history": chat_history or [],
+                "answer_language": answer_language
+            })
             
             # Extract sources and format them - simplified format for frontend
             sources = []
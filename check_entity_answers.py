@@ -0,0 +1,90 @@
+"""
+Check which questions the entity index answers on its own, against the
+scraped pages in web_scraping_results.json. Catalog questions must get a
+reply about the expected entity or category; questions that need generation
+must fall through to the chain (None). Exits with code 1 on any mismatch.
+
+Usage:
+python check_entity_answers.py [--results web_scraping_results.json]
+"""
+from entity_index import EntityIndex
+from translation_service import TranslationService
+import argparse
+import json
+import time
+
+# (question, detected language, expected: a name the answer must mention, or None)
+CASES = [
+    # Catalog questions answered from the index
+    ("do you treat gout?", 'en', "Gout"),
+    ("Do you have treatment for psoriasis", 'en', "Psoriasis"),
+    ("is there treatment for diabetes", 'en', "Diabetes & Related Issues"),
+    ("do you treat hairloss", 'en', "Hair Loss"),
+    ("do you treat ibs", 'en', "Irritable Bowel Syndrome"),
+    ("do you treat PCOD", 'en', "Pcod"),
+    ("do you offer nasiyam", 'en', "Nasyam"),
+    ("do you do kili treatment", 'en', "Kizhi"),
+    ("do you provide oil massage", 'en', "Oil Massage"),
+    ("list wellness treatments", 'en', "Wellness Treatments"),
+    ("which therapeutic treatments are available", 'en', "Therapeutic Treatments"),
+    ("what treatments do you offer?", 'en', "Illness Treatments"),
+    ("contact page link", 'en', "Contact"),
+    ("goutinu chikitsa undo?", 'manglish', "Gout"),
+    ("dhara cheyyumo", 'manglish', "Dhara"),
+    ("ethokke chikitsakal undu", 'manglish', "Wellness Treatments"),
+    ("ഗൗട്ട് ചികിത്സ ഉണ്ടോ?", 'ml', "Gout"),
+    # Questions that need generation fall through to the chain
+    ("my mother has gout, which food to avoid?", 'en', None),
+    ("I have diabetes, can I eat rice", 'en', None),
+    ("is there any age limit for pizhichil", 'en', None),
+    ("is dhara available on sunday?", 'en', None),
+    ("do you have parking for pizhichil patients", 'en', None),
+    ("I have acne after using steam bath, is that normal?", 'en', None),
+    ("ente ammakku gout undu, enthu kazhikkanam?", 'manglish', None),
+    ("which treatments are available for acne and hair loss", 'en', None),
+    ("do you treat acne and hair loss", 'en', None),
+    ("what is gout?", 'en', None),
+    ("how is gout treated", 'en', None),
+    ("what are the symptoms of piles", 'en', None),
+    ("do you treat cancer?", 'en', None),
+    ("hello", 'en', None),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Check entity index answers')
+    parser.add_argument('--results', type=str, default='web_scraping_results.json',
+                        help='Scraped pages to build the index from')
+    args = parser.parse_args()
+
+    with open(args.results, 'r', encoding='utf-8') as f:
+        index = EntityIndex.build(json.load(f))
+    translator = TranslationService()
+
+    failures = []
+    timings = []
+    for question, language, expected in CASES:
+        # Same preprocessing as ChatbotOrchestrator.chat
+        text = question
+        if language == 'ml':
+            text = translator.transliterate_malayalam(question, to_malayalam=False)
+        start = time.perf_counter()
+        response = index.answer(text, language)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        if expected is None:
+            ok = response is None
+        else:
+            ok = response is not None and expected in response['answer']
+        status = 'ok  ' if ok else 'FAIL'
+        got = 'chain' if response is None else response['answer'].split('\n')[0]
+        print(f"{status} {question!r:60} -> {got}")
+        if not ok:
+            failures.append(question)
+
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} cases pass; "
+          f"max {max(timings):.1f} ms per question")
+    if failures:
+        raise SystemExit(f"FAIL: {len(failures)} cases")
+
+if __name__ == "__main__":
+    main()
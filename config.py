@@ -8,6 +8,12 @@ load_dotenv()
 class Config:
     WEBSITE_URL = os.getenv('BASE_URL', 'https://sreesuryaayurveda.com')
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    # Store for sessions and caches shared by serving workers ('memory://' or 'sqlite:///path')
+    SHARED_STORE_URL = os.getenv('SHARED_STORE_URL', 'sqlite:///./data/shared_store.sqlite3')
+    # Multilingual embedding model, so Malayalam and Manglish queries match English chunks
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+    # Answer Malayalam/Manglish questions directly instead of translating queries and answers
+    CROSS_LINGUAL = os.getenv('CROSS_LINGUAL', 'true').lower() in ('1', 'true', 'yes')
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,156 @@
+import json
+import os
+import logging
+from typing import List, Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CrawlCheckpoint:
+    """
+    Incremental on-disk checkpoint for a crawl.
+
+    Every processed page is appended as one JSON line to ``crawl.log``. Every
+    ``snapshot_interval`` pages the full state (visited set, frontier and
+    extracted pages) is written atomically to ``snapshot.json`` and the log is
+    truncated. Resuming loads the snapshot and replays the log on top of it.
+    """
+
+    def __init__(self, base_url: str,
+                 checkpoint_dir: str = "./data/crawl_checkpoint",
+                 snapshot_interval: int = 25):
+        self.base_url = base_url
+        self.checkpoint_dir = checkpoint_dir
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_path = os.path.join(checkpoint_dir, "snapshot.json")
+        self.log_path = os.path.join(checkpoint_dir, "crawl.log")
+        self.seq = 0
+        self._log_file = None
+        self._records_since_snapshot = 0
+
+    def exists(self) -> bool:
+        """Check if a checkpoint for this site is available on disk."""
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('base_url') == self.base_url
+        except (OSError, ValueError):
+            return False
+
+    def load(self) -> Optional[Dict]:
+        """
+        Load the snapshot and replay the log on top of it.
+        Returns a dict with 'visited', 'frontier' and 'pages', or None.
+        """
+        if not self.exists():
+            return None
+
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+
+        visited = set(snapshot['visited'])
+        frontier = list(snapshot['frontier'])
+        pages = snapshot['pages']
+        self.seq = snapshot['seq']
+
+        replayed = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Partially written last line from a crash
+                        break
+                    if record['seq'] <= self.seq:
+                        continue
+                    self._apply(record, visited, frontier, pages)
+                    self.seq = record['seq']
+                    replayed += 1
+
+        logger.info(f"Resuming crawl: {len(visited)} visited, {len(frontier)} queued, "
+                    f"{len(pages)} pages ({replayed} log records replayed)")
+        return {'visited': visited, 'frontier': frontier, 'pages': pages}
+
+    @staticmethod
+    def _apply(record: Dict, visited: set, frontier: List[str], pages: List[Dict]) -> None:
+        """Apply one log record to the in-memory crawl state."""
+        url = record['url']
+        # The crawler pops from the front of the frontier, skipping already
+        # visited URLs, so drop everything up to and including this URL.
+        while frontier:
+            if frontier.pop(0) == url:
+                break
+        if record.get('failed'):
+            return
+        visited.add(record.get('key', url))
+        if record.get('page'):
+            pages.append(record['page'])
+        frontier.extend(record.get('links', []))
+
+    def snapshot(self, visited: set, frontier: List[str], pages: List[Dict]) -> None:
+        """Write the full crawl state atomically and truncate the log."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'base_url': self.base_url,
+                'seq': self.seq,
+                'visited': sorted(visited),
+                'frontier': frontier,
+                'pages': pages
+            }, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Records up to self.seq are now in the snapshot and are skipped on
+        # replay, so a crash before the truncate below is harmless.
+        if self._log_file:
+            self._log_file.close()
+        self._log_file = open(self.log_path, 'w', encoding='utf-8')
+        self._records_since_snapshot = 0
+
+    def record_page(self, url: str, page: Optional[Dict], links: List[str],
+                    visited: set, frontier: List[str], pages: List[Dict],
+                    key: Optional[str] = None) -> None:
+        """
+        Append a processed page to the log, snapshotting periodically. url is
+        the frontier entry that was fetched; key, if different, is what goes
+        into the visited set.
+        """
+        record = {'url': url, 'page': page, 'links': links}
+        if key and key != url:
+            record['key'] = key
+        self._append(record)
+        if self._records_since_snapshot >= self.snapshot_interval:
+            self.snapshot(visited, frontier, pages)
+
+    def record_failure(self, url: str) -> None:
+        """Append a page that failed to load so it is not retried on resume."""
+        self._append({'url': url, 'failed': True})
+
+    def _append(self, record: Dict) -> None:
+        if self._log_file is None:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            self._log_file = open(self.log_path, 'a', encoding='utf-8')
+        self.seq += 1
+        record['seq'] = self.seq
+        self._log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Flush to the OS so a process crash loses nothing; skip fsync to
+        # keep the per-page cost negligible.
+        self._log_file.flush()
+        self._records_since_snapshot += 1
+
+    def close(self) -> None:
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
+
+    def clear(self) -> None:
+        """Remove the checkpoint after a crawl has completed."""
+        self.close()
+        for path in (self.snapshot_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,11 +1,14 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import Chroma
 from langchain.schema import Document
+from vector_index import SharedIndex, MmapVectorStore
+from embedding_pipeline import EmbeddingPipeline
+from entity_index import EntityIndex
+from config import Config
+import hashlib
 import json
 import os
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,15 +17,31 @@ class DataProcessingAgent:
     def __init__(self, 
                  chunk_size: int = 1000,  # Increased chunk size for better context
                  chunk_overlap: int = 200,  # Increased overlap
-                 persist_directory: str = "./data/chroma_db"):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-        self.embeddings = OpenAIEmbeddings()
+                 persist_directory: str = "./data/vector_index"):
+        self._text_splitter = None
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embeddings = OpenAIEmbeddings(model=Config.EMBEDDING_MODEL)
         self.persist_directory = persist_directory
+        self.index = SharedIndex(persist_directory, self.embeddings)
+        # Index builds use a client without its own retry loop, since the
+        # pipeline retries throttled batches and adapts its concurrency
+        self.embedding_pipeline = EmbeddingPipeline(
+            OpenAIEmbeddings(model=Config.EMBEDDING_MODEL, max_retries=1)
+        )
+
+    @property
+    def text_splitter(self):
+        # Only needed when building an index, not when serving one
+        if self._text_splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+        return self._text_splitter
 
     def _create_structured_content(self, item: Dict) -> str:
         """Create well-structured content from a page item."""
@@ -105,8 +124,8 @@ class DataProcessingAgent:
         
         return documents
 
-    async def process_data(self) -> Chroma:
-        """Process scraped data and create vector store."""
+    async def process_data(self) -> MmapVectorStore:
+        """Process scraped data, publish a new index version and open it."""
         try:
             os.makedirs(self.persist_directory, exist_ok=True)
             
@@ -121,16 +140,38 @@ class DataProcessingAgent:
             documents = self._prepare_documents(scraped_data)
             logger.info(f"Prepared {len(documents)} documents")
             
-            # Create and persist vector store
-            vectorstore = Chroma.from_documents(
-                documents=documents,
-                embedding=self.embeddings,
-                persist_directory=self.persist_directory
-            )
-            vectorstore.persist()
+            # Embed in concurrent, rate-limit aware batches and publish as a new index version
+            texts = [doc.page_content for doc in documents]
+            vectors = await self.embedding_pipeline.embed(texts)
+            # Catalog of treatments, conditions and pages for answers without the LLM
+            entities = EntityIndex.build(scraped_data)
+            version = self.index.publish(texts, [doc.metadata for doc in documents], vectors,
+                                         info=self.build_config(), entities=entities.to_dict(),
+                                         manifest=self.build_manifest(scraped_data))
             
-            return vectorstore
+            return self.index.load(version)
             
         except Exception as e:
             logger.error(f"Error during data processing: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    def build_config(self) -> Dict:
+        """Settings an index was built with, recorded alongside it."""
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'embedding_model': getattr(self.embeddings, 'model', ''),
+        }
+
+    def build_manifest(self, scraped_data: List[Dict]) -> List[Dict]:
+        """The crawl an index was built from: URL, title, lastmod and content hash per page."""
+        return [{
+            'url': page['url'],
+            'title': page.get('title', ''),
+            'lastmod': page.get('lastmod'),
+            'sha1': hashlib.sha1(page.get('main_content', '').encode('utf-8')).hexdigest()
+        } for page in scraped_data]
+
+    def load_index(self) -> Optional[MmapVectorStore]:
+        """Open the current published index read-only, without any embedding calls."""
+        return self.index.load()
@@ -0,0 +1,161 @@
+from langchain.embeddings.base import Embeddings
+from typing import List, Dict, Optional
+import numpy as np
+import asyncio
+import logging
+import random
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _is_rate_limit(error: Exception) -> bool:
+    """Recognize throttling errors from the OpenAI client (old and new) or HTTP 429s."""
+    if 'RateLimit' in type(error).__name__:
+        return True
+    status = getattr(error, 'http_status', None) or getattr(error, 'status_code', None)
+    return status == 429
+
+class EmbeddingPipeline:
+    """
+    Embed chunks in token-bounded batches with a bounded number of batches in
+    flight. Throttling halves the allowed concurrency and backs off
+    exponentially; successes grow it back one slot at a time. Failed batches
+    are retried on their own, so finished batches are never redone.
+    """
+
+    def __init__(self, embeddings: Embeddings,
+                 max_batch_tokens: int = 50000,
+                 max_batch_size: int = 512,
+                 max_concurrency: int = 4,
+                 max_retries: int = 8,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats: Dict = {}
+        self._encoding = None
+
+    def _count_tokens(self, text: str) -> int:
+        if self._encoding is None:
+            try:
+                import tiktoken
+                model = getattr(self.embeddings, 'model', '') or 'text-embedding-ada-002'
+                try:
+                    self._encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                # tiktoken missing, or its encoding files cannot be fetched
+                logger.warning(f"Token counting falls back to a character estimate: {e}")
+                self._encoding = False
+        if self._encoding is False:
+            # Roughly four characters per token for English text
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches bounded by token count and size."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = self._count_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens
+                            or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed all texts, returning a float32 matrix in input order."""
+        if not texts:
+            raise ValueError("No texts to embed")
+        start = time.perf_counter()
+        batches = self.make_batches(texts)
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+
+        limit = self.max_concurrency
+        in_flight = 0
+        successes = 0
+        retries = 0
+        throttled = 0
+        slot_freed = asyncio.Condition()
+
+        async def run_batch(batch_number: int) -> None:
+            nonlocal limit, in_flight, successes, retries, throttled
+            batch = [texts[i] for i in batches[batch_number]]
+            for attempt in range(self.max_retries + 1):
+                async with slot_freed:
+                    await slot_freed.wait_for(lambda: in_flight < limit)
+                    in_flight += 1
+                try:
+                    vectors = await asyncio.to_thread(self.embeddings.embed_documents, batch)
+                except Exception as e:
+                    rate_limited = _is_rate_limit(e)
+                    async with slot_freed:
+                        in_flight -= 1
+                        successes = 0
+                        if rate_limited:
+                            throttled += 1
+                            limit = max(1, limit // 2)
+                        slot_freed.notify_all()
+                    if attempt == self.max_retries:
+                        raise RuntimeError(
+                            f"Embedding batch {batch_number} failed after {attempt + 1} attempts: {e}"
+                        ) from e
+                    retries += 1
+                    delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)
+                    logger.warning(f"Embedding batch {batch_number} "
+                                   f"{'throttled' if rate_limited else 'failed'}; "
+                                   f"retrying in {delay:.1f}s with concurrency {limit}")
+                    await asyncio.sleep(delay)
+                    continue
+
+                results[batch_number] = vectors
+                async with slot_freed:
+                    in_flight -= 1
+                    successes += 1
+                    # Additive increase once a full window succeeded
+                    if successes >= limit and limit < self.max_concurrency:
+                        limit += 1
+                        successes = 0
+                    slot_freed.notify_all()
+                return
+
+        tasks = [asyncio.ensure_future(run_batch(i)) for i in range(len(batches))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One batch gave up (or the build was cancelled); stop the others
+            # instead of spending quota on a build that is thrown away
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'chunks': len(texts),
+            'batches': len(batches),
+            'retries': retries,
+            'throttled': throttled,
+            'seconds': round(elapsed, 2),
+            'chunks_per_sec': round(len(texts) / elapsed, 1) if elapsed else 0.0,
+        }
+        logger.info(f"Embedded {len(texts)} chunks in {len(batches)} batches in {elapsed:.1f}s "
+                    f"({self.stats['chunks_per_sec']} chunks/sec, {retries} retries, "
+                    f"{throttled} throttled)")
+
+        vectors = [vector for batch in results for vector in batch]
+        return np.array(vectors, dtype=np.float32)
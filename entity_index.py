@@ -0,0 +1,370 @@
+from url_utils import canonicalize_url
+from typing import List, Dict, Optional, Tuple
+from difflib import SequenceMatcher
+import logging
+import time
+import re
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spelling rules applied before fuzzy matching, so English spellings and
+# Manglish renderings of the same word ("dhara"/"dara", "kizhi"/"kili",
+# "nasyam"/"nasiyam") compare equal or close
+SOUND_RULES = [
+    ('ph', 'f'), ('zh', 'l'), ('th', 't'), ('dh', 'd'), ('sh', 's'),
+    ('kh', 'k'), ('gh', 'g'), ('bh', 'b'), ('ck', 'k'), ('q', 'k'),
+    ('w', 'v'), ('z', 's'), ('ee', 'i'), ('oo', 'u'), ('y', 'i'), ('ou', 'au'),
+]
+
+# Malayalam case endings glued onto a word in Manglish ("goutinu", "acnekku")
+MANGLISH_SUFFIXES = ('inte', 'inu', 'ikku', 'kku', 'nte', 'ude', 'ine', 'il', 'nu', 'um', 'o')
+
+# A question is answered from the index only if it is essentially
+# "<trigger> <entity>": every word must be part of the entity name, a trigger
+# word for the intent or a stopword. Anything else (a question word, a second
+# clause, "food", "sunday", "parking") means the question needs generation.
+# Words are matched in English and Manglish; Malayalam script questions are
+# transliterated first, which yields spellings like "unto" and "chikiths".
+STOPWORDS = {
+    'i', 'we', 'you', 'u', 'your', 'do', 'does', 'can', 'is', 'are', 'there', 'any',
+    'a', 'an', 'the', 'for', 'of', 'at', 'in', 'here', 'clinic', 'please', 'me', 'us',
+    'ivide', 'ningal', 'ningalude', 'ningalkku', 'ano', 'aano', 'ulla',
+}
+AVAILABILITY_WORD = re.compile(
+    r'^(treat|treats|treated|treatments?|cure|offer|offers|provide|provides|have|has|'
+    r'available|und[ou]|unto|cheyyumo|cheyyo|chiki(t|th|l)s\w*|kittumo|ayurvedic)$'
+)
+LISTING_WORD = re.compile(
+    r'^(list|show|which|what|all|enthokke|ethokke|ethellam|enthellam|'
+    r'treatments?|therap(y|ies)|services|conditions|illness(es)?|chiki(t|th|l)s\w*|'
+    r'available|offer|provide|have|und[ou]|unto)$'
+)
+CATALOG_WORD = re.compile(r'^(treatments|therapies|services|conditions|illnesses|chiki(t|th|l)s\w*)$')
+LINK_WORD = re.compile(r'^(link|page|url|website|where|find|read|see)$')
+# Punctuation inside the question starts a second clause
+CLAUSE_BREAK = re.compile(r'[,;:?!]|\.\s')
+
+# Headings that name a catalog item are often numbered ("4. Nasyam")
+NUMBERING = re.compile(r'^\s*\d+[.)]\s*')
+
+ANSWERS = {
+    'en': {
+        'available': "Yes, {name} is listed under {categories} at the clinic.",
+        'description': "{description}",
+        'more': "More details: {url}",
+        'list': "{category}: {items}.",
+        'link': "{name}: {url}",
+    },
+    'manglish': {
+        'available': "Undu, {name} ivide {categories} il undu.",
+        'description': "",
+        'more': "Kooduthal vivarangal: {url}",
+        'list': "{category}: {items}.",
+        'link': "{name}: {url}",
+    },
+    'ml': {
+        'available': "ഉണ്ട്, {name} ഇവിടെ {categories} വിഭാഗത്തിൽ ലഭ്യമാണ്.",
+        'description': "",
+        'more': "കൂടുതൽ വിവരങ്ങൾ: {url}",
+        'list': "{category}: {items}.",
+        'link': "{name}: {url}",
+    },
+}
+
+def phonetic(text: str) -> str:
+    """Lowercase, keep letters and digits, and fold spelling variants."""
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    folded = []
+    for word in words:
+        word = re.sub(r'c(?=[aou])', 'k', word)
+        for source, target in SOUND_RULES:
+            word = word.replace(source, target)
+        folded.append(re.sub(r'(.)\1+', r'\1', word))
+    return ' '.join(folded)
+
+def aliases_for(name: str) -> List[str]:
+    """
+    Names an entity can be asked about: the full name, the part before a
+    parenthesis, each parenthesized alternative, each side of a slash and
+    the head of an "X & Related Issues" style name.
+    """
+    name = NUMBERING.sub('', name).strip()
+    aliases = [name]
+    outer = re.sub(r'\(.*?\)', ' ', name).strip()
+    aliases.append(outer)
+    for inner in re.findall(r'\((.*?)\)', name):
+        aliases.extend(part.strip() for part in inner.split(','))
+    for alias in list(aliases):
+        if '/' in alias:
+            aliases.extend(part.strip() for part in alias.split('/'))
+        if '&' in alias:
+            aliases.append(alias.split('&')[0].strip())
+    seen, result = set(), []
+    for alias in aliases:
+        key = phonetic(alias)
+        if len(key) >= 3 and key not in seen:
+            seen.add(key)
+            result.append(alias)
+    return result
+
+def _page_name(page: Dict) -> str:
+    """Page title without the " - SITE NAME" suffix."""
+    title = page.get('title') or page.get('metadata', {}).get('og:title', '')
+    return title.split(' - ')[0].strip()
+
+def _summary(text: str, limit: int = 300) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = cut.rfind('. ')
+    return cut[:end + 1] if end > limit // 2 else cut.rsplit(' ', 1)[0] + '...'
+
+def _meta_description(page: Dict) -> str:
+    """
+    The page's meta description, if it reads as prose. No description beats
+    an arbitrary line of the body, which is often a symptom bullet.
+    """
+    description = ' '.join(page.get('metadata', {}).get('description', '').split())
+    if len(description.split()) < 4 or '{' in description:
+        return ''
+    return _summary(description)
+
+def _text_after(page: Dict, heading: str) -> str:
+    """The prose line following a heading in the page body, if any."""
+    lines = [line.strip() for line in page.get('main_content', '').split('\n')]
+    for i, line in enumerate(lines[:-1]):
+        if line == heading and len(lines[i + 1].split()) >= 4:
+            return _summary(lines[i + 1])
+    return ''
+
+class EntityIndex:
+    """
+    Catalog of what the site offers, built from page titles, headings and
+    metadata when the index is processed. Maps treatments, conditions and
+    page titles to their URL and a short description, and answers
+    catalog-style questions ("do you treat gout?", "list wellness
+    treatments") without retrieval or an LLM call.
+    """
+
+    def __init__(self, entities: Optional[List[Dict]] = None,
+                 categories: Optional[List[Dict]] = None, cutoff: float = 0.85):
+        self.entities = entities or []
+        self.categories = categories or []
+        self.cutoff = cutoff
+        # (phonetic alias, number of words, entity) for every alias
+        self._aliases: List[Tuple[str, int, Dict]] = [
+            (key, len(key.split()), entity)
+            for entity in self.entities + self.categories
+            for key in (phonetic(alias) for alias in entity['aliases'])
+        ]
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    @classmethod
+    def build(cls, pages: List[Dict], base_url: Optional[str] = None) -> 'EntityIndex':
+        """
+        Build the catalog from scraped pages. Every page is an entity named by
+        its title. A page whose headings list at least three other entities
+        is a category; its listed items join that category, and items without
+        a page of their own become entities pointing at the category page.
+        """
+        by_url: Dict[str, Dict] = {}
+        for page in pages:
+            if 'page not found' in page.get('title', '').lower():
+                continue
+            url = canonicalize_url(page['url'], base_url)
+            if url in by_url:
+                continue
+            name = _page_name(page)
+            aliases = aliases_for(name)
+            for heading in page.get('headings', []):
+                if heading['level'] == 'h1':
+                    aliases += [a for a in aliases_for(heading['text'])
+                                if phonetic(a) not in {phonetic(b) for b in aliases}]
+            # Long names are often abbreviated on the page itself ("IBS")
+            words = re.findall(r'[A-Za-z]+', name)
+            acronym = ''.join(word[0] for word in words).upper()
+            if len(words) >= 3 and re.search(rf'\b{acronym}\b', page.get('main_content', '')):
+                aliases.append(acronym)
+            by_url[url] = {
+                'name': name,
+                'aliases': aliases,
+                'url': url,
+                'description': _meta_description(page),
+                'categories': [],
+                '_page': page,
+            }
+
+        def find(alias_keys: List[str]) -> Optional[Dict]:
+            for entity in by_url.values():
+                if any(phonetic(a) in alias_keys for a in entity['aliases']):
+                    return entity
+            return None
+
+        # Candidate categories: pages whose headings name at least three entities
+        candidates = []
+        for url, page_entity in by_url.items():
+            page = page_entity['_page']
+            items = []
+            for heading in page.get('headings', []):
+                if heading['level'] == 'h1':
+                    continue
+                text = NUMBERING.sub('', heading['text']).strip()
+                entity = find([phonetic(a) for a in aliases_for(text)])
+                items.append((heading['level'], heading['text'].strip(), text, entity))
+            matched = [item for item in items if item[3] is not None and item[3] is not page_entity]
+            if len(matched) >= 3:
+                # Listed items are the headings at the level of the matched ones
+                level = matched[0][0]
+                candidates.append((page_entity, [item for item in items if item[0] == level]))
+
+        # A category listing a subset of another's items (a teaser on the home
+        # page) is not a category of its own
+        def item_names(listing):
+            return {phonetic(text) for _, _, text, _ in listing}
+        categories = []
+        for page_entity, listing in candidates:
+            names = item_names(listing)
+            if any(other is not page_entity and names < item_names(other_listing)
+                   for other, other_listing in candidates):
+                continue
+            categories.append((page_entity, listing))
+
+        extra: Dict[str, Dict] = {}
+        category_entries = []
+        category_pages = [page_entity for page_entity, _ in categories]
+        for page_entity, listing in categories:
+            category = page_entity['name']
+            members = []
+            for _, raw, text, entity in listing:
+                if any(entity is other for other in category_pages):
+                    # A link to another category, not an item
+                    continue
+                if entity is None:
+                    key = phonetic(text)
+                    entity = extra.get(key)
+                    if entity is None:
+                        entity = extra[key] = {
+                            'name': text,
+                            'aliases': aliases_for(text),
+                            'url': page_entity['url'],
+                            'description': _text_after(page_entity['_page'], raw),
+                            'categories': [],
+                        }
+                if category not in entity['categories']:
+                    entity['categories'].append(category)
+                members.append(entity['name'])
+            category_entries.append({
+                'name': category,
+                'aliases': aliases_for(category),
+                'url': page_entity['url'],
+                'items': members,
+            })
+
+        entities = []
+        for entity in list(by_url.values()) + list(extra.values()):
+            entity.pop('_page', None)
+            entities.append(entity)
+        logger.info(f"Built entity index: {len(entities)} entities in "
+                    f"{len(category_entries)} categories")
+        return cls(entities, category_entries)
+
+    def to_dict(self) -> Dict:
+        return {'entities': self.entities, 'categories': self.categories}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'EntityIndex':
+        data = data or {}
+        return cls(data.get('entities'), data.get('categories'))
+
+    def match(self, text: str) -> List[Tuple[float, Dict, Tuple[int, int]]]:
+        """
+        Entities and categories named in the text with their scores and the
+        word span that named them, best first. Query word spans are compared
+        to each alias after phonetic folding, ignoring spaces ("hairloss"),
+        and a single-word alias also matches the word with a Manglish case
+        ending ("goutinu").
+        """
+        words = phonetic(text).split()
+        scores: Dict[int, Tuple[float, Dict, Tuple[int, int]]] = {}
+        for key, size, entity in self._aliases:
+            compact = key.replace(' ', '')
+            best, best_span = 0.0, (0, 0)
+            for span_size in {size, max(1, size - 1)}:
+                for start in range(len(words) - span_size + 1):
+                    span = ''.join(words[start:start + span_size])
+                    if span == compact:
+                        score = 1.0
+                    elif size == 1 and len(key) >= 4 and any(
+                            span == key + suffix for suffix in MANGLISH_SUFFIXES):
+                        score = 0.99
+                    elif len(compact) >= 5:
+                        matcher = SequenceMatcher(None, span, compact)
+                        score = matcher.ratio() if matcher.quick_ratio() >= self.cutoff else 0.0
+                    else:
+                        score = 0.0
+                    if score > best:
+                        best, best_span = score, (start, start + span_size)
+            if best >= self.cutoff:
+                # Longer aliases are more specific ("oil massage" over "massage")
+                score = best + size * 0.01
+                if score > scores.get(id(entity), (0.0,))[0]:
+                    scores[id(entity)] = (score, entity, best_span)
+        return sorted(scores.values(), key=lambda match: -match[0])
+
+    def answer(self, query: str, language: str = 'en') -> Optional[Dict]:
+        """
+        Answer a catalog question from the index, or return None if the
+        question needs retrieval and generation.
+        """
+        start = time.perf_counter()
+        text = ' '.join(query.lower().split())
+        if not self.entities or CLAUSE_BREAK.search(text.rstrip(' ?!.')):
+            return None
+        words = re.findall(r'[a-z0-9]+', text)
+        matches = self.match(text)
+
+        # Only the closest category: "wellness" also scores against "illness"
+        top_category = max((score for score, m, _ in matches if 'items' in m), default=None)
+        categories = [m for score, m, _ in matches if 'items' in m and score == top_category]
+        # A category's own page is not a separate entity
+        category_names = {category['name'] for category in self.categories}
+        entities = [m for _, m, _ in matches if 'items' not in m and m['name'] not in category_names]
+        covered = {i for _, _, (begin, end) in matches for i in range(begin, end)}
+        rest = [word for i, word in enumerate(words) if i not in covered and word not in STOPWORDS]
+
+        def only(pattern) -> bool:
+            return all(pattern.match(word) for word in rest)
+
+        templates = ANSWERS.get(language, ANSWERS['en'])
+        lines, sources = [], []
+        if not entities and rest and only(LISTING_WORD) and (
+                categories or any(CATALOG_WORD.match(word) for word in rest)):
+            for category in categories or self.categories:
+                lines.append(templates['list'].format(
+                    category=category['name'], items=', '.join(category['items'])
+                ))
+                sources.append(category['url'])
+        elif len(entities) == 1 and not categories and rest and only(AVAILABILITY_WORD) \
+                and entities[0]['categories']:
+            entity = entities[0]
+            lines.append(templates['available'].format(
+                name=entity['name'], categories=', '.join(entity['categories'])
+            ))
+            if templates['description'] and entity['description']:
+                lines.append(templates['description'].format(description=entity['description']))
+            lines.append(templates['more'].format(url=entity['url']))
+            sources.append(entity['url'])
+        elif len(entities) == 1 and rest and only(LINK_WORD) and any(
+                w in ('link', 'page', 'url', 'website') for w in rest):
+            entity = entities[0]
+            lines.append(templates['link'].format(name=entity['name'], url=entity['url']))
+            sources.append(entity['url'])
+        else:
+            # Several entities, extra words or no clear intent: let the chain answer
+            return None
+
+        logger.info(f"Answered from the entity index in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return {"answer": "\n\n".join(lines), "sources": sources}
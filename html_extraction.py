@@ -0,0 +1,138 @@
+from lxml import etree
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional
+import re
+
+# Elements dropped before extraction (tags and class names)
+REMOVED_TAGS = {'script', 'style', 'iframe', 'nav', 'footer'}
+REMOVED_CLASSES = {'header', 'footer', 'navigation', 'menu', 'sidebar'}
+
+HEADING_TAGS = {'h1', 'h2', 'h3'}
+
+# Main content candidates in priority order: main, article, [role="main"],
+# .main-content, #main-content, .content, #content. The first selector that
+# matches anything wins, even if a later selector matches earlier in the page.
+CONTENT_SELECTOR_COUNT = 7
+
+def _content_selectors(tag: str, attrib, classes: set) -> List[int]:
+    """Return the indices of the content selectors this element matches."""
+    matches = []
+    if tag == 'main':
+        matches.append(0)
+    if tag == 'article':
+        matches.append(1)
+    if attrib.get('role') == 'main':
+        matches.append(2)
+    if 'main-content' in classes:
+        matches.append(3)
+    if attrib.get('id') == 'main-content':
+        matches.append(4)
+    if 'content' in classes:
+        matches.append(5)
+    if attrib.get('id') == 'content':
+        matches.append(6)
+    return matches
+
+class _TreeWalk:
+    """
+    Single pass over the parsed document. Text nodes are collected in document
+    order and elements of interest record the token span they cover, so
+    heading and main content text are slices of one token list.
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.headings: List[List] = []
+        self.candidates: List[Optional[List[int]]] = [None] * CONTENT_SELECTOR_COUNT
+        self.body: Optional[List[int]] = None
+        self.metadata: Dict[str, str] = {}
+
+    def visit(self, element) -> None:
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions carry no content
+            return
+
+        attrib = element.attrib
+        class_attr = attrib.get('class')
+        classes = set(class_attr.split()) if class_attr else set()
+        if tag in REMOVED_TAGS or (classes and not classes.isdisjoint(REMOVED_CLASSES)):
+            return
+
+        if tag == 'meta':
+            name = attrib.get('name', attrib.get('property', ''))
+            content = attrib.get('content', '')
+            if name and content:
+                self.metadata[name] = content
+
+        # Spans are registered on entry so nested matches keep document order
+        # and are completed once the subtree has been walked
+        start = len(self.tokens)
+        spans = []
+        if tag in HEADING_TAGS:
+            heading = [tag, start, start]
+            self.headings.append(heading)
+            spans.append(heading)
+        if tag == 'body' and self.body is None:
+            self.body = [start, start]
+            spans.append(self.body)
+        for index in _content_selectors(tag, attrib, classes):
+            if self.candidates[index] is None:
+                self.candidates[index] = [start, start]
+                spans.append(self.candidates[index])
+        if element.text:
+            self.tokens.append(element.text)
+        for child in element:
+            self.visit(child)
+            if child.tail:
+                self.tokens.append(child.tail)
+
+        for span in spans:
+            span[-1] = len(self.tokens)
+
+def extract_page_content(html: str, url: str, title: str) -> Optional[Dict]:
+    """
+    Extract structured content (headings, main content and meta tags) from
+    rendered page HTML. Module level so it can run in a process pool.
+    """
+    parser = etree.HTMLParser(encoding='utf-8')
+    root = etree.fromstring(html.encode('utf-8'), parser)
+
+    structured_content = {
+        'url': url,
+        'title': title,
+        'headings': [],
+        'main_content': '',
+        'metadata': {}
+    }
+    if root is None:
+        return structured_content
+
+    walk = _TreeWalk()
+    walk.visit(root)
+    tokens = walk.tokens
+
+    # Headings in document order
+    for level, start, end in walk.headings:
+        text = ''.join(tokens[start:end]).strip()
+        if text:
+            structured_content['headings'].append({'level': level, 'text': text})
+
+    # Main content from the highest priority selector, falling back to body
+    main_span = next((span for span in walk.candidates if span), walk.body)
+    if main_span:
+        start, end = main_span
+        text = '\n'.join(token.strip() for token in tokens[start:end] if token.strip())
+        text = re.sub(r'\n\s*\n', '\n', text)  # Remove multiple newlines
+        structured_content['main_content'] = text
+
+    structured_content['metadata'] = walk.metadata
+    return structured_content
+
+def _extract_args(args: Tuple[str, str, str]) -> Optional[Dict]:
+    return extract_page_content(*args)
+
+def extract_many(pages: List[Tuple[str, str, str]], max_workers: Optional[int] = None) -> List[Optional[Dict]]:
+    """Extract a batch of (html, url, title) pages in a process pool."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_extract_args, pages, chunksize=8))
@@ -2,6 +2,7 @@ import asyncio
 import argparse
 from orchestrator import ChatbotOrchestrator
 import logging
+import uuid
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -10,11 +11,27 @@ async def main():
     parser = argparse.ArgumentParser(description='Website Chatbot')
     parser.add_argument('--url', type=str, required=True, help='Website URL to scrape')
     parser.add_argument('--force-scrape', action='store_true', help='Force new scraping')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted scrape from its checkpoint')
+    parser.add_argument('--export-bundle', type=str, metavar='PATH', help='Write the built index as a site bundle and exit')
+    parser.add_argument('--load-bundle', type=str, metavar='PATH', help='Serve from a prebuilt site bundle')
     args = parser.parse_args()
     
     try:
         orchestrator = ChatbotOrchestrator(args.url)
-        await orchestrator.initialize(force_scrape=args.force_scrape)
+        if args.load_bundle:
+            orchestrator.load_bundle(args.load_bundle)
+        elif args.export_bundle and not (args.force_scrape or args.resume) and orchestrator.load_index():
+            # Export the already published index without rebuilding it
+            pass
+        else:
+            await orchestrator.initialize(force_scrape=args.force_scrape, resume=args.resume)
+        
+        if args.export_bundle:
+            header = orchestrator.export_bundle(args.export_bundle)
+            print(f"Exported bundle {header['bundle_id']} to {args.export_bundle}")
+            return
+        
+        session_id = uuid.uuid4().hex
         
         print("\nChatbot initialized! Type 'quit' to exit, 'clear' to clear chat history.")
         print("You can type in any language or use Malayalam in English letters!")
@@ -25,7 +42,7 @@ async def main():
             if query.lower() == 'quit':
                 break
             elif query.lower() == 'clear':
-                orchestrator.clear_chat_history()
+                orchestrator.clear_chat_history(session_id)
                 print("Chat history cleared!")
                 continue
             elif not query:
@@ -35,7 +52,7 @@ async def main():
             detected_lang = orchestrator.translator.detect_language(query)
             print(f"Detected language: {detected_lang}")
             
-            response = await orchestrator.chat(query)
+            response = await orchestrator.chat(query, session_id)
             print("\nAssistant:", response["answer"])
             if response["sources"]:
                 print("\nSources:", response["sources"])
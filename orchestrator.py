@@ -1,8 +1,13 @@
-from scraping_agents import WebScrapingAgent, VisualScrapingAgent
 from data_processor import DataProcessingAgent
 from chatbot import WebsiteChatbot
+from entity_index import EntityIndex
 from translation_service import TranslationService
-from typing import List, Dict, Optional
+from shared_store import SharedStore, create_store
+from config import Config
+from site_bundle import export_bundle, load_bundle
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
 import logging
 import json
 import os
@@ -14,38 +19,127 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How answers are written for each detected input language
+ANSWER_LANGUAGES = {
+    'en': "English",
+    'ml': "Malayalam, written in Malayalam script",
+    'manglish': "Malayalam written in English letters (Manglish), not in Malayalam script",
+}
+
 class ChatbotOrchestrator:
-    def __init__(self, website_url: str):
+    def __init__(self, website_url: str, store: SharedStore = None,
+                 max_history_turns: int = 10, response_cache_ttl: float = 24 * 3600):
         self.website_url = website_url
-        self.web_scraper = WebScrapingAgent(website_url)
-        self.visual_scraper = VisualScrapingAgent(website_url)
+        # Scraping agents (Playwright, OCR, HTML parsing) are only imported and
+        # built when a crawl runs, so serving processes never load them
+        self._web_scraper = None
+        self._visual_scraper = None
         self.processor = DataProcessingAgent()
-        self.translator = TranslationService()
+        # Sessions and caches live in a store that all serving workers share
+        self.store = store or create_store(Config.SHARED_STORE_URL)
+        self.translator = TranslationService(cache=self.store)
         self.chatbot: Optional[WebsiteChatbot] = None
+        self.entities = EntityIndex()
+        self.index_version = ''
+        # Serving from a bundle pins the index; published versions are ignored
+        self.bundle_path: Optional[str] = None
+        self.max_history_turns = max_history_turns
+        self.response_cache_ttl = response_cache_ttl
+        # Identical history-free questions being answered right now, by cache key
+        self._in_flight: Dict[str, Dict] = {}
+        # Chat turns cancelled by their caller, turns that joined an identical
+        # in-flight turn, shared executions cancelled once nobody waited, and
+        # turns answered from the entity index
+        self.stats = {'cancelled': 0, 'coalesced': 0, 'cancelled_executions': 0, 'entity_answers': 0}
         
-    async def initialize(self, force_scrape: bool = False) -> None:
+    @property
+    def web_scraper(self):
+        if self._web_scraper is None:
+            from scraping_agents import WebScrapingAgent
+            self._web_scraper = WebScrapingAgent(self.website_url)
+        return self._web_scraper
+    
+    @property
+    def visual_scraper(self):
+        if self._visual_scraper is None:
+            from scraping_agents import VisualScrapingAgent
+            self._visual_scraper = VisualScrapingAgent(self.website_url)
+        return self._visual_scraper
+    
+    async def initialize(self, force_scrape: bool = False, resume: bool = False) -> None:
         """
         Initialize the chatbot system. Can reuse existing scraped data unless force_scrape is True.
+        With resume=True an interrupted crawl continues from its checkpoint.
         """
         try:
-            if force_scrape or not self._check_existing_data():
+            if resume and self._checkpoint_exists():
+                logger.info("Resuming interrupted web scraping...")
+                await self._perform_scraping(resume=True)
+            elif force_scrape or not self._check_existing_data():
                 logger.info("Starting web scraping...")
                 await self._perform_scraping()
             
             logger.info("Processing data and initializing chatbot...")
             vectorstore = await self.processor.process_data()
-            self.chatbot = WebsiteChatbot(vectorstore)
+            self._use_vectorstore(vectorstore)
             logger.info("Chatbot initialization complete!")
             
         except Exception as e:
             logger.error(f"Error during initialization: {e}")
             raise
+    
+    def load_index(self) -> bool:
+        """
+        Serve from the published index without scraping or embedding.
+        Returns False if no index has been built yet.
+        """
+        vectorstore = self.processor.load_index()
+        if vectorstore is None:
+            return False
+        self._use_vectorstore(vectorstore)
+        return True
+    
+    def load_bundle(self, path: str) -> None:
+        """Serve from a prebuilt site bundle; makes no embedding or network calls."""
+        self._use_vectorstore(load_bundle(path, self.processor.embeddings))
+        self.bundle_path = path
+    
+    def export_bundle(self, path: str) -> Dict:
+        """Write the current published index as a site bundle."""
+        return export_bundle(self.processor.index, path, self.website_url)
+    
+    def _use_vectorstore(self, vectorstore) -> None:
+        self.chatbot = WebsiteChatbot(vectorstore)
+        self.entities = EntityIndex.from_dict(getattr(vectorstore, 'entities', None))
+        self.index_version = vectorstore.version
+    
+    def _refresh_index(self) -> None:
+        """Hot-swap to an index version published by another process."""
+        if not self.bundle_path and self.processor.index.refresh():
+            logger.info(f"Switched to index version {self.processor.index.store.version}")
+            self._use_vectorstore(self.processor.index.store)
+    
+    # Store calls may do file I/O (SQLite), so the async path runs them in a thread
+
+    async def _get_history(self, session_id: str) -> List:
+        turns = await asyncio.to_thread(self.store.get, 'session', session_id)
+        return [tuple(turn) for turn in turns or []]
+    
+    async def _save_turn(self, session_id: str, question: str, answer: str) -> None:
+        await asyncio.to_thread(self.store.append, 'session', session_id, [question, answer],
+                                self.max_history_turns)
+    
+    def _response_cache_key(self, query: str, input_lang: str) -> str:
+        """Cache key for a history-free question against the current index version."""
+        normalized = ' '.join(query.lower().split())
+        raw = f"{self.website_url}|{self.index_version}|{input_lang}|{normalized}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
             
-    async def _perform_scraping(self) -> None:
+    async def _perform_scraping(self, resume: bool = False) -> None:
         """Perform both web and visual scraping."""
         try:
             # Perform web scraping
-            web_data = await self.web_scraper.scrape_site()
+            web_data = await self.web_scraper.scrape_site(resume=resume)
             with open("web_scraping_results.json", "w", encoding="utf-8") as f:
                 json.dump(web_data, f, ensure_ascii=False, indent=2)
                 
@@ -61,56 +155,155 @@ class ChatbotOrchestrator:
             logger.error(f"Error during scraping: {e}")
             raise
             
+    def _checkpoint_exists(self) -> bool:
+        """Check for an interrupted crawl without importing the scraping stack."""
+        if self._web_scraper is not None:
+            return self._web_scraper.checkpoint.exists()
+        from crawl_checkpoint import CrawlCheckpoint
+        from url_utils import canonicalize_url
+        return CrawlCheckpoint(canonicalize_url(self.website_url)).exists()
+    
     def _check_existing_data(self) -> bool:
         """Check if scraped data already exists."""
         return (os.path.exists("web_scraping_results.json") and 
                 os.path.exists("visual_scraping_results.json"))
     
-    async def chat(self, query: str) -> Dict:
-        """Process chat query and return response."""
+    async def _translated_response(self, query: str, input_lang: str,
+                                   history: List) -> Tuple[str, str, Dict]:
+        """Answer through English: translate the query in and the answer back out."""
+        # Translate query to English for processing
+        if input_lang != 'en':
+            translated_query, _ = await self.translator.translate_text(query, target_lang='en')
+            logger.info(f"Translated query: {translated_query}")
+        else:
+            translated_query = query
+        
+        # Get response from chatbot
+        response = await self.chatbot.get_response(translated_query, history)
+        english_answer = response["answer"]
+        
+        # Handle response translation based on input language
+        if input_lang == 'ml':
+            # Translate to Malayalam script
+            translated_answer, _ = await self.translator.translate_text(
+                response["answer"], 
+                target_lang='ml'
+            )
+            response["answer"] = translated_answer
+            
+        elif input_lang == 'manglish':
+            logger.info("Converting response to Manglish...")
+            # First translate to Malayalam
+            ml_answer, _ = await self.translator.translate_text(
+                response["answer"], 
+                target_lang='ml'
+            )
+            logger.info(f"Malayalam translation: {ml_answer}")
+            
+            # Then convert Malayalam to Manglish
+            manglish_answer = self.translator.transliterate_malayalam(
+                ml_answer, 
+                to_malayalam=False
+            )
+            logger.info(f"Final Manglish answer: {manglish_answer}")
+            response["answer"] = manglish_answer
+        
+        return translated_query, english_answer, response
+            
+    async def _answer(self, query: str, input_lang: str, history: List,
+                      cache_key: Optional[str] = None) -> Tuple[str, str, Dict]:
+        """Run the retrieval and LLM pipeline; returns (question, answer) for history and the response."""
+        if Config.CROSS_LINGUAL:
+            # The embedding model is multilingual, so the query is searched
+            # as written and the answer is generated in the user's language
+            question = query
+            response = await self.chatbot.get_response(
+                query, history, answer_language=ANSWER_LANGUAGES[input_lang]
+            )
+            answer = response["answer"]
+        else:
+            question, answer, response = await self._translated_response(query, input_lang, history)
+        
+        # Error responses carry no sources and are never cached
+        if cache_key and response["sources"]:
+            await asyncio.to_thread(self.store.set, 'response', cache_key, {
+                'question': question,
+                'answer': answer,
+                'response': response
+            }, ttl=self.response_cache_ttl)
+        return question, answer, response
+    
+    async def _coalesced(self, key: str, run: Callable[[], Awaitable]):
+        """
+        Share one execution among identical in-flight requests. The work runs
+        as its own task; it is cancelled only when every caller waiting on it
+        has been cancelled.
+        """
+        turn = self._in_flight.get(key)
+        if turn:
+            self.stats['coalesced'] += 1
+        else:
+            turn = {'task': asyncio.ensure_future(run()), 'waiters': 0}
+            self._in_flight[key] = turn
+            turn['task'].add_done_callback(
+                lambda _: self._in_flight.pop(key) if self._in_flight.get(key) is turn else None
+            )
+        
+        turn['waiters'] += 1
+        try:
+            return await asyncio.shield(turn['task'])
+        finally:
+            turn['waiters'] -= 1
+            if turn['waiters'] == 0 and not turn['task'].done():
+                turn['task'].cancel()
+                self.stats['cancelled_executions'] += 1
+    
+    async def chat(self, query: str, session_id: str = 'default') -> Dict:
+        """
+        Process chat query for a session and return response. Cancelling the
+        call cancels the outbound translation, retrieval and LLM requests.
+        """
         try:
+            self._refresh_index()
+            
             # Detect input language
             input_lang = self.translator.detect_language(query)
             logger.info(f"Detected language: {input_lang}")
             
-            # Translate query to English for processing
-            if input_lang != 'en':
-                translated_query, _ = await self.translator.translate_text(query, target_lang='en')
-                logger.info(f"Translated query: {translated_query}")
+            history = await self._get_history(session_id)
+            if history:
+                question, answer, response = await self._answer(query, input_lang, history)
             else:
-                translated_query = query
-            
-            # Get response from chatbot
-            response = await self.chatbot.get_response(translated_query)
-            
-            # Handle response translation based on input language
-            if input_lang == 'ml':
-                # Translate to Malayalam script
-                translated_answer, _ = await self.translator.translate_text(
-                    response["answer"], 
-                    target_lang='ml'
-                )
-                response["answer"] = translated_answer
-                
-            elif input_lang == 'manglish':
-                logger.info("Converting response to Manglish...")
-                # First translate to Malayalam
-                ml_answer, _ = await self.translator.translate_text(
-                    response["answer"], 
-                    target_lang='ml'
-                )
-                logger.info(f"Malayalam translation: {ml_answer}")
+                # Catalog questions are answered from the entity index, no LLM
+                # call; follow-up turns need the history, so they skip it
+                entity_query = query
+                if input_lang == 'ml':
+                    entity_query = self.translator.transliterate_malayalam(query, to_malayalam=False)
+                response = self.entities.answer(entity_query, input_lang)
+                if response:
+                    self.stats['entity_answers'] += 1
+                    await self._save_turn(session_id, query, response["answer"])
+                    return response
                 
-                # Then convert Malayalam to Manglish
-                manglish_answer = self.translator.transliterate_malayalam(
-                    ml_answer, 
-                    to_malayalam=False
+                # Answers that do not depend on earlier turns are shared across sessions
+                cache_key = self._response_cache_key(query, input_lang)
+                cached = await asyncio.to_thread(self.store.get, 'response', cache_key)
+                if cached:
+                    await self._save_turn(session_id, cached['question'], cached['answer'])
+                    return cached['response']
+                question, answer, response = await self._coalesced(
+                    cache_key, lambda: self._answer(query, input_lang, [], cache_key)
                 )
-                logger.info(f"Final Manglish answer: {manglish_answer}")
-                response["answer"] = manglish_answer
+                # Coalesced callers share the result; each gets its own copy
+                response = {"answer": response["answer"], "sources": list(response["sources"])}
             
+            await self._save_turn(session_id, question, answer)
             return response
             
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            logger.info(f"Cancelled chat turn for session {session_id}")
+            raise
         except Exception as e:
             logger.error(f"Error during chat: {e}")
             return {
@@ -118,7 +311,6 @@ class ChatbotOrchestrator:
                 "sources": []
             }
             
-    def clear_chat_history(self) -> None:
-        """Clear the chatbot's conversation history."""
-        if self.chatbot:
-            self.chatbot.clear_history() 
\ No newline at end of file
+    def clear_chat_history(self, session_id: str = 'default') -> None:
+        """Clear a session's conversation history."""
+        self.store.delete('session', session_id) 
\ No newline at end of file
@@ -0,0 +1,154 @@
+from urllib.parse import urlsplit
+from typing import List, Dict, Optional, Iterable
+import logging
+import json
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Third-party hosts that never contribute page content
+TRACKING_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'googleadservices.com', 'facebook.net',
+    'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'tawk.to',
+    'embed.tawk.to', 'crisp.chat', 'intercom.io', 'widget.intercom.io',
+    'zopim.com', 'zdassets.com', 'livechatinc.com', 'tiktok.com',
+    'snap.licdn.com', 'bat.bing.com'
+]
+
+# Selectors that identify the main content, in priority order
+CONTENT_SELECTORS = ['main', 'article', '[role="main"]', '.main-content', '#main-content', '.content', '#content']
+
+# The first selector, in priority order, that matches an element
+FIRST_MATCH_SCRIPT = """
+selectors => selectors.find(s => document.querySelector(s)) || null
+"""
+
+# Resolves once the subtree under selector has seen no DOM mutation for
+# quietMs, or after timeoutMs at the latest
+QUIET_WINDOW_SCRIPT = """
+([selector, quietMs, timeoutMs]) => new Promise(resolve => {
+    const target = document.querySelector(selector);
+    if (!target) { resolve(false); return; }
+    let quietTimer = setTimeout(done, quietMs);
+    const deadline = setTimeout(() => done(false), timeoutMs);
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(done, quietMs);
+    });
+    observer.observe(target, {childList: true, subtree: true, characterData: true});
+    function done(quiet = true) {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadline);
+        resolve(quiet);
+    }
+})
+"""
+
+class ResourcePolicy:
+    """Request routing policy: which resource types and hosts a page may load."""
+
+    def __init__(self, blocked_resource_types: Optional[Iterable[str]] = None,
+                 blocked_domains: Optional[Iterable[str]] = None):
+        self.blocked_resource_types = set(blocked_resource_types or [])
+        self.blocked_domains = [d.lower() for d in (blocked_domains or [])]
+        self.blocked_count = 0
+
+    @classmethod
+    def for_extraction(cls) -> 'ResourcePolicy':
+        """DOM extraction only needs the document and the scripts that build it."""
+        return cls(
+            blocked_resource_types=['image', 'media', 'font', 'stylesheet'],
+            blocked_domains=TRACKING_DOMAINS
+        )
+
+    @classmethod
+    def for_screenshots(cls) -> 'ResourcePolicy':
+        """Screenshots and OCR need the page as a visitor sees it, so nothing is blocked."""
+        return cls()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.blocked_resource_types and not self.blocked_domains
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlsplit(url).hostname or '').lower()
+        return any(host == domain or host.endswith('.' + domain) for domain in self.blocked_domains)
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_count += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def apply(self, target) -> None:
+        """Install the policy on a Playwright page or browser context."""
+        if not self.is_empty:
+            await target.route('**/*', self._handle)
+
+async def load_page(page, url: str, selectors: Optional[List[str]] = None,
+                    quiet_ms: int = 500, timeout_ms: int = 10000,
+                    content_timeout_ms: int = 3000) -> Dict:
+    """
+    Navigate adaptively: wait for DOMContentLoaded, then for the main content
+    selector, then for a quiet window with no DOM mutations under it. Pages
+    without a recognizable content element fall back to watching the body.
+    Returns timings in milliseconds and the selector that was watched.
+    """
+    selectors = selectors or CONTENT_SELECTORS
+    start = time.perf_counter()
+    await page.goto(url, wait_until='domcontentloaded')
+    dom_ready = time.perf_counter()
+
+    quiet = False
+    selector = 'body'
+    try:
+        try:
+            await page.wait_for_selector(', '.join(selectors), state='attached',
+                                         timeout=content_timeout_ms)
+            selector = await page.evaluate(FIRST_MATCH_SCRIPT, selectors) or 'body'
+        except Exception:
+            logger.info(f"No main content element on {url}; watching the body")
+        quiet = await page.evaluate(QUIET_WINDOW_SCRIPT, [selector, quiet_ms, timeout_ms])
+    except Exception as e:
+        logger.warning(f"Content did not settle on {url}: {e}")
+    settled = time.perf_counter()
+
+    return {
+        'url': url,
+        'dom_content_loaded_ms': round((dom_ready - start) * 1000, 1),
+        'content_settled_ms': round((settled - dom_ready) * 1000, 1),
+        'content_selector': selector,
+        'quiet': bool(quiet)
+    }
+
+class PageTimings:
+    """Per-page load timings for a crawl, with slow pages called out in the log."""
+
+    def __init__(self, slow_page_ms: float = 5000):
+        self.slow_page_ms = slow_page_ms
+        self.records: List[Dict] = []
+
+    def add(self, record: Dict) -> None:
+        self.records.append(record)
+        if record.get('total_ms', 0) >= self.slow_page_ms:
+            logger.warning(f"Slow page ({record['total_ms']:.0f} ms): {record['url']}")
+
+    def summary(self, top: int = 5) -> None:
+        if not self.records:
+            return
+        totals = sorted(r['total_ms'] for r in self.records)
+        median = totals[len(totals) // 2]
+        logger.info(f"Loaded {len(totals)} pages: median {median:.0f} ms, max {totals[-1]:.0f} ms")
+        for record in sorted(self.records, key=lambda r: r['total_ms'], reverse=True)[:top]:
+            logger.info(f"  {record['total_ms']:8.0f} ms  {record['url']}")
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
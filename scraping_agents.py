@@ -1,30 +1,48 @@
 import asyncio
-from bs4 import BeautifulSoup
-import trafilatura
 from playwright.async_api import async_playwright
-from PIL import Image
-import pytesseract
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urldefrag
 import logging
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Set
 import json
 import re
+import os
+import time
+from crawl_checkpoint import CrawlCheckpoint
+from html_extraction import extract_page_content
+from page_loading import ResourcePolicy, PageTimings, load_page
+from sitemap_discovery import SitemapDiscovery
+from url_utils import canonicalize_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class WebScrapingAgent:
-    def __init__(self, base_url: str):
-        self.base_url = base_url
+    def __init__(self, base_url: str, checkpoint_dir: str = "./data/crawl_checkpoint",
+                 snapshot_interval: int = 25, extraction_workers: int = 0,
+                 resource_policy: ResourcePolicy = None, slow_page_ms: float = 5000):
+        self.start_url = urldefrag(base_url.strip())[0]
+        self.base_url = canonicalize_url(base_url)
+        # Canonical URLs; the frontier keeps URLs as linked, which is what gets fetched
         self.visited_urls: Set[str] = set()
         self.content_data: List[Dict] = []
+        self.checkpoint = CrawlCheckpoint(self.base_url, checkpoint_dir, snapshot_interval)
+        self.discovery = SitemapDiscovery(self.base_url)
+        self.lastmods: Dict[str, str] = {}
+        # Extraction runs inline unless a worker count is given
+        self.extraction_workers = extraction_workers
+        self.extraction_pool = None
+        # Images, fonts, media and trackers are not needed to read the DOM
+        self.resource_policy = resource_policy or ResourcePolicy.for_extraction()
+        self.timings = PageTimings(slow_page_ms)
         
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL belongs to the same domain and is a valid content page."""
         try:
             base_domain = urlparse(self.base_url).netloc
-            url_domain = urlparse(url).netloc
+            # Compare canonical hosts so www/non-www and http/https variants count
+            url_domain = urlparse(self._key(url)).netloc
             
             # Skip common non-content URLs
             skip_patterns = [
@@ -43,81 +61,24 @@ class WebScrapingAgent:
             if any(re.search(pattern, url.lower()) for pattern in skip_patterns):
                 return False
                 
-            return base_domain == url_domain
+            return base_domain == url_domain and self.discovery.can_fetch(url)
         except:
             return False
             
     async def _extract_page_content(self, page, url: str) -> Dict:
         """Extract structured content from a page."""
         try:
-            # Wait for content to load
-            await page.wait_for_load_state('networkidle')
-            
             # Get the page content
             content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup.select('script, style, iframe, nav, footer, .header, .footer, .navigation, .menu, .sidebar'):
-                element.decompose()
-            
-            # Extract structured content
-            structured_content = {
-                'url': url,
-                'title': await page.title(),
-                'headings': [],
-                'main_content': '',
-                'metadata': {}
-            }
-            
-            # Extract headings
-            for heading in soup.find_all(['h1', 'h2', 'h3']):
-                if heading.text.strip():
-                    structured_content['headings'].append({
-                        'level': heading.name,
-                        'text': heading.text.strip()
-                    })
-            
-            # Try to find main content
-            main_content = None
-            content_selectors = [
-                'main',
-                'article',
-                '[role="main"]',
-                '.main-content',
-                '#main-content',
-                '.content',
-                '#content'
-            ]
-            
-            for selector in content_selectors:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
+            title = await page.title()
             
-            if not main_content:
-                main_content = soup.find('body')
-            
-            # Clean and extract text
-            if main_content:
-                # Remove empty elements and unwanted characters
-                for element in main_content.find_all():
-                    if len(element.get_text(strip=True)) == 0:
-                        element.decompose()
-                
-                text = main_content.get_text(separator='\n', strip=True)
-                text = re.sub(r'\n\s*\n', '\n', text)  # Remove multiple newlines
-                structured_content['main_content'] = text
-            
-            # Extract metadata
-            meta_tags = soup.find_all('meta')
-            for tag in meta_tags:
-                name = tag.get('name', tag.get('property', ''))
-                content = tag.get('content', '')
-                if name and content:
-                    structured_content['metadata'][name] = content
-            
-            return structured_content
+            # Parsing is CPU bound, so hand it to the process pool when enabled
+            if self.extraction_pool:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.extraction_pool, extract_page_content, content, url, title
+                )
+            return extract_page_content(content, url, title)
             
         except Exception as e:
             logger.error(f"Error extracting content from {url}: {e}")
@@ -126,32 +87,77 @@ class WebScrapingAgent:
     async def _find_links(self, page) -> List[str]:
         """Extract all valid links from the page."""
         try:
-            links = set()
+            links = {}
             
-            # Get all links from the page
+            # Get all links from the page, one per canonical URL
             elements = await page.query_selector_all('a[href]')
             for element in elements:
                 href = await element.get_attribute('href')
                 if href:
-                    full_url = urljoin(self.base_url, href)
+                    full_url = urldefrag(urljoin(page.url, href))[0]
                     if self._is_valid_url(full_url):
-                        links.add(full_url)
+                        links.setdefault(self._key(full_url), full_url)
             
-            return list(links)
+            return list(links.values())
             
         except Exception as e:
             logger.error(f"Error finding links: {e}")
             return []
 
-    async def scrape_site(self) -> List[Dict]:
-        """Scrape the entire website."""
+    def _key(self, url: str) -> str:
+        """Dedup key for a URL; the URL itself is what gets fetched."""
+        return canonicalize_url(url, self.base_url)
+
+    def _load_previous_results(self) -> Dict[str, Dict]:
+        """Load pages from the last completed crawl, keyed by canonical URL."""
+        if not os.path.exists('web_scraping_results.json'):
+            return {}
         try:
+            with open('web_scraping_results.json', 'r', encoding='utf-8') as f:
+                return {canonicalize_url(item['url'], self.base_url): item for item in json.load(f)}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load previous results: {e}")
+            return {}
+
+    async def _seed_from_sitemaps(self, request) -> List[str]:
+        """Seed the frontier from robots.txt/sitemaps, most recently modified first."""
+        entries = await self.discovery.discover(request)
+        
+        frontier = [self.start_url]
+        seen = {self._key(self.start_url)}
+        self.lastmods = {}
+        for entry in entries:
+            url = urldefrag(entry['url'])[0]
+            if not self._is_valid_url(url):
+                continue
+            key = self._key(url)
+            if entry['lastmod']:
+                self.lastmods[key] = entry['lastmod']
+            if key not in seen:
+                seen.add(key)
+                frontier.append(url)
+        
+        return frontier
+
+    async def scrape_site(self, resume: bool = False) -> List[Dict]:
+        """
+        Scrape the entire website. Progress is checkpointed to disk after every
+        page; with resume=True the crawl continues from the last checkpoint.
+        """
+        try:
+            if self.extraction_workers:
+                self.extraction_pool = ProcessPoolExecutor(max_workers=self.extraction_workers)
+            
+            state = self.checkpoint.load() if resume else None
+            previous_pages = self._load_previous_results()
+            
             async with async_playwright() as p:
                 browser = await p.chromium.launch()
                 context = await browser.new_context(
                     viewport={'width': 1920, 'height': 1080},
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
                 )
+                await self.resource_policy.apply(context)
                 
                 # Create a new page
                 page = await context.new_page()
@@ -159,37 +165,77 @@ class WebScrapingAgent:
                 # Configure timeouts
                 page.set_default_timeout(30000)
                 
-                # URLs to process
-                urls_to_visit = [self.base_url]
+                # Seed the frontier from robots.txt and sitemaps in a few fetches
+                # instead of discovering every page by rendering its parents
+                seeded_urls = await self._seed_from_sitemaps(context.request)
+                
+                if state:
+                    self.visited_urls = state['visited']
+                    self.content_data = state['pages']
+                    urls_to_visit = state['frontier']
+                else:
+                    self.visited_urls = set()
+                    self.content_data = []
+                    urls_to_visit = seeded_urls
+                    self.checkpoint.seq = 0
+                    self.checkpoint.snapshot(self.visited_urls, urls_to_visit, self.content_data)
                 
                 while urls_to_visit and len(self.visited_urls) < 100:  # Limit to 100 pages
                     url = urls_to_visit.pop(0)
+                    key = self._key(url)
                     
-                    if url in self.visited_urls:
+                    if key in self.visited_urls:
                         continue
                     
                     try:
+                        # Reuse the previous crawl's copy when the sitemap says
+                        # the page has not changed since
+                        lastmod = self.lastmods.get(key)
+                        previous = previous_pages.get(key)
+                        if lastmod and previous and previous.get('lastmod') == lastmod:
+                            logger.info(f"Unchanged since {lastmod}, reusing: {url}")
+                            self.content_data.append(previous)
+                            self.visited_urls.add(key)
+                            self.checkpoint.record_page(url, previous, [], self.visited_urls,
+                                                        urls_to_visit, self.content_data, key=key)
+                            continue
+                        
                         logger.info(f"Scraping: {url}")
                         
-                        # Navigate to the page
-                        await page.goto(url, wait_until='networkidle')
+                        # Navigate to the page and wait for the content to settle
+                        blocked_before = self.resource_policy.blocked_count
+                        timing = await load_page(page, url)
                         
                         # Extract content
+                        extract_start = time.perf_counter()
                         content = await self._extract_page_content(page, url)
-                        if content and content['main_content'].strip():
+                        timing['extract_ms'] = round((time.perf_counter() - extract_start) * 1000, 1)
+                        timing['total_ms'] = round(timing['dom_content_loaded_ms'] + timing['content_settled_ms']
+                                                   + timing['extract_ms'], 1)
+                        timing['blocked_requests'] = self.resource_policy.blocked_count - blocked_before
+                        self.timings.add(timing)
+                        if not (content and content['main_content'].strip()):
+                            content = None
+                        if content:
+                            if lastmod:
+                                content['lastmod'] = lastmod
                             self.content_data.append(content)
                         
                         # Find new links
                         new_links = await self._find_links(page)
-                        urls_to_visit.extend([link for link in new_links if link not in self.visited_urls])
+                        new_links = [link for link in new_links if self._key(link) not in self.visited_urls]
+                        urls_to_visit.extend(new_links)
                         
-                        self.visited_urls.add(url)
+                        self.visited_urls.add(key)
+                        self.checkpoint.record_page(url, content, new_links, self.visited_urls,
+                                                    urls_to_visit, self.content_data, key=key)
                         
                         # Rate limiting
                         await asyncio.sleep(1)
                         
                     except Exception as e:
                         logger.error(f"Error processing {url}: {e}")
+                        self.checkpoint.record_failure(url)
                         continue
                 
                 await browser.close()
@@ -198,18 +244,33 @@ class WebScrapingAgent:
                 with open('web_scraping_results.json', 'w', encoding='utf-8') as f:
                     json.dump(self.content_data, f, ensure_ascii=False, indent=2)
                 
+                self.timings.summary()
+                self.timings.save('crawl_timings.json')
+                
+                # The crawl finished, so the next run starts fresh
+                self.checkpoint.clear()
+                
                 return self.content_data
                 
         except Exception as e:
             logger.error(f"Scraping error: {e}")
             return []
+        finally:
+            self.checkpoint.close()
+            if self.extraction_pool:
+                self.extraction_pool.shutdown()
+                self.extraction_pool = None
 
 class VisualScrapingAgent:
-    def __init__(self, base_url):
+    def __init__(self, base_url, resource_policy: ResourcePolicy = None):
         self.playwright = None
         self.browser = None
-        self.base_url = base_url
+        self.start_url = urldefrag(base_url.strip())[0]
+        self.base_url = canonicalize_url(base_url)
         self.visited_urls = set()
+        # Screenshots need images, fonts and styles, so nothing is blocked by default
+        self.resource_policy = resource_policy or ResourcePolicy.for_screenshots()
+        self.timings = PageTimings()
     
     async def setup(self):
         self.playwright = await async_playwright().start()
@@ -224,41 +285,52 @@ class VisualScrapingAgent:
     def _is_valid_url(self, url):
         """Check if URL belongs to the same domain."""
         base_domain = urlparse(self.base_url).netloc
-        url_domain = urlparse(url).netloc
+        url_domain = urlparse(canonicalize_url(url, self.base_url)).netloc
         return base_domain == url_domain
 
     async def _extract_internal_links(self, page):
         """Extract internal links from the page using Playwright."""
-        links = set()
+        links = {}
         elements = await page.query_selector_all('a[href]')
         for element in elements:
             href = await element.get_attribute('href')
             if href:
-                full_url = urljoin(self.base_url, href)
+                full_url = urldefrag(urljoin(page.url, href))[0]
                 if self._is_valid_url(full_url):
-                    links.add(full_url)
+                    links.setdefault(canonicalize_url(full_url, self.base_url), full_url)
         return links
 
     async def scrape_site(self):
         if not self.browser:
             await self.setup()
 
-        urls_to_visit = [self.base_url]
+        urls_to_visit = [self.start_url]
         collected_data = []
 
         try:
             while urls_to_visit:
                 url = urls_to_visit.pop(0)
-                if url in self.visited_urls:
+                key = canonicalize_url(url, self.base_url)
+                if key in self.visited_urls:
                     continue
 
                 try:
                     logger.info(f"Visually scraping: {url}")
                     page = await self.browser.new_page()
-                    await page.goto(url)
-                    await page.wait_for_load_state('networkidle')
+                    await self.resource_policy.apply(page)
+                    timing = await load_page(page, url)
+                    # Screenshots also need images, which the load event covers
+                    # without waiting on long-lived widget connections
+                    load_start = time.perf_counter()
+                    await page.wait_for_load_state('load')
+                    timing['load_event_ms'] = round((time.perf_counter() - load_start) * 1000, 1)
+                    timing['total_ms'] = round(timing['dom_content_loaded_ms'] + timing['content_settled_ms']
+                                               + timing['load_event_ms'], 1)
+                    self.timings.add(timing)
 
                     # Capture and process screenshot
+                    from PIL import Image
+                    import pytesseract
                     screenshot_bytes = await page.screenshot(full_page=True)
                     image = Image.open(BytesIO(screenshot_bytes))
                     text = pytesseract.image_to_string(image)
@@ -271,9 +343,9 @@ class VisualScrapingAgent:
 
                     # Find new links
                     new_urls = await self._extract_internal_links(page)
-                    urls_to_visit.extend([u for u in new_urls if u not in self.visited_urls])
+                    urls_to_visit.extend([u for k, u in new_urls.items() if k not in self.visited_urls])
 
-                    self.visited_urls.add(url)
+                    self.visited_urls.add(key)
                     await page.close()
 
                     # Rate limiting
@@ -282,6 +354,7 @@ class VisualScrapingAgent:
                 except Exception as e:
                     logger.error(f"Error visually scraping {url}: {e}")
 
+            self.timings.summary()
             return collected_data
 
         finally:
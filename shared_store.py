@@ -0,0 +1,161 @@
+from typing import Any, Dict, Optional, Tuple
+import threading
+import sqlite3
+import logging
+import json
+import time
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SharedStore:
+    """
+    Key/value store for state shared between serving workers (chat sessions,
+    response and translation caches). Values are JSON-serializable and live
+    in a namespace, optionally with a time-to-live in seconds.
+    """
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def append(self, namespace: str, key: str, item: Any, max_items: Optional[int] = None) -> None:
+        """
+        Atomically append to a list value, keeping at most max_items of the
+        newest entries, so concurrent writers never lose an item.
+        """
+        raise NotImplementedError
+
+class MemoryStore(SharedStore):
+    """Process-local store, for a single worker or the CLI."""
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, str], Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[(namespace, key)]
+                return None
+            return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[(namespace, key)] = (value, expires_at)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+    def append(self, namespace: str, key: str, item: Any, max_items: Optional[int] = None) -> None:
+        with self._lock:
+            value, expires_at = self._data.get((namespace, key), (None, None))
+            if expires_at is not None and expires_at < time.time():
+                value = None
+            items = (value or []) + [item]
+            self._data[(namespace, key)] = (items[-max_items:] if max_items else items, None)
+
+class SQLiteStore(SharedStore):
+    """
+    Store backed by a local SQLite file in WAL mode, shared by all worker
+    processes on the host. Each process (and thread) opens its own connection.
+    """
+
+    def __init__(self, path: str = "./data/shared_store.sqlite3"):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so they are keyed by pid
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return None
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False), expires_at)
+        )
+        conn.commit()
+
+    def delete(self, namespace: str, key: str) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+        conn.commit()
+
+    def append(self, namespace: str, key: str, item: Any, max_items: Optional[int] = None) -> None:
+        conn = self._connection()
+        # Take the write lock before reading so no other process can
+        # interleave its own read-modify-write
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            items = []
+            if row is not None and (row[1] is None or row[1] >= time.time()):
+                items = json.loads(row[0])
+            items.append(item)
+            if max_items:
+                items = items[-max_items:]
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, NULL)",
+                (namespace, key, json.dumps(items, ensure_ascii=False))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def create_store(url: str) -> SharedStore:
+    """
+    Create a store from a URL: 'memory://' or 'sqlite:///path/to/file.sqlite3'.
+    """
+    if url.startswith('memory://'):
+        return MemoryStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteStore(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported shared store URL: {url}")
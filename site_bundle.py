@@ -0,0 +1,132 @@
+from langchain.embeddings.base import Embeddings
+from vector_index import SharedIndex, MmapVectorStore, query_embedding_for
+from typing import Dict, Optional
+import numpy as np
+import hashlib
+import logging
+import struct
+import json
+import time
+import mmap
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bundle layout:
+#   magic (8 bytes) | header length (uint64 LE) | header JSON | padding
+#   vectors (float32, row-major, 64-byte aligned) | chunks JSON
+# The header records section offsets relative to the payload and a SHA-256
+# over the payload.
+MAGIC = b'WCABNDL1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+def _payload_offset(header_length: int) -> int:
+    offset = len(MAGIC) + 8 + header_length
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def export_bundle(index: SharedIndex, output_path: str, site_url: str,
+                  version: Optional[str] = None) -> Dict:
+    """
+    Write the current (or given) index version as a single versioned,
+    checksummed bundle file. Returns the bundle header.
+    """
+    version = version or index.current_version()
+    if not version:
+        raise ValueError("No published index to export")
+
+    version_dir = os.path.join(index.versions_dir, version)
+    vectors = np.ascontiguousarray(np.load(os.path.join(version_dir, "vectors.npy")), dtype=np.float32)
+    with open(os.path.join(version_dir, "chunks.json"), 'r', encoding='utf-8') as f:
+        chunks = json.load(f)
+
+    vector_bytes = vectors.tobytes()
+    chunk_bytes = json.dumps(
+        {'texts': chunks['texts'], 'metadatas': chunks['metadatas'],
+         'entities': chunks.get('entities', {})},
+        ensure_ascii=False
+    ).encode('utf-8')
+
+    count, dim = vectors.shape if vectors.size else (0, 0)
+    header = {
+        'format_version': FORMAT_VERSION,
+        'index_version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'site_url': site_url,
+        'count': count,
+        'dim': dim,
+        'config': chunks.get('info', {}),
+        # Recorded when the version was built, so it describes the crawl
+        # these vectors came from even after a re-crawl
+        'manifest': chunks.get('manifest', []),
+    }
+
+    # Section offsets are relative to the payload, which starts at the first
+    # aligned offset after the header
+    payload = vector_bytes + chunk_bytes
+    header['sections'] = {
+        'vectors': {'offset': 0, 'length': len(vector_bytes)},
+        'chunks': {'offset': len(vector_bytes), 'length': len(chunk_bytes)},
+    }
+    header['sha256'] = hashlib.sha256(payload).hexdigest()
+    header['bundle_id'] = header['sha256'][:16]
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    payload_offset = _payload_offset(len(header_bytes))
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (payload_offset - f.tell()))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Exported bundle {header['bundle_id']} ({count} chunks, "
+                f"{os.path.getsize(output_path) / 1e6:.1f} MB) to {output_path}")
+    return header
+
+def read_bundle_header(path: str) -> Dict:
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a site bundle")
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    header['payload_offset'] = _payload_offset(header_length)
+    if header.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version {header.get('format_version')}")
+    return header
+
+def load_bundle(path: str, embedding: Embeddings, verify: bool = True) -> MmapVectorStore:
+    """
+    Memory-map a bundle and serve it directly. No embedding or network calls
+    are made; the embedding is only used later to embed queries.
+    """
+    start = time.perf_counter()
+    header = read_bundle_header(path)
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    base = header['payload_offset']
+    sections = header['sections']
+    if verify:
+        payload_end = base + sections['chunks']['offset'] + sections['chunks']['length']
+        if hashlib.sha256(memoryview(mapped)[base:payload_end]).hexdigest() != header['sha256']:
+            raise ValueError(f"Checksum mismatch in bundle {path}")
+
+    count, dim = header['count'], header['dim']
+    vectors = np.frombuffer(mapped, dtype=np.float32, count=count * dim,
+                            offset=base + sections['vectors']['offset']).reshape(count, dim)
+    chunk_start = base + sections['chunks']['offset']
+    chunks = json.loads(mapped[chunk_start:chunk_start + sections['chunks']['length']])
+
+    embedding = query_embedding_for(embedding, header.get('config', {}))
+    store = MmapVectorStore(embedding, vectors, chunks['texts'], chunks['metadatas'],
+                            version=header['bundle_id'], entities=chunks.get('entities'))
+    logger.info(f"Loaded bundle {header['bundle_id']} for {header['site_url']} ({count} chunks) "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return store
@@ -0,0 +1,129 @@
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+import xml.etree.ElementTree as ET
+import logging
+import gzip
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tried in order when robots.txt does not declare any sitemap
+FALLBACK_SITEMAPS = ['/sitemap.xml', '/sitemap_index.xml', '/wp-sitemap.xml']
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag."""
+    return tag.rsplit('}', 1)[-1]
+
+def _lastmod_timestamp(lastmod: Optional[str]) -> float:
+    """Parse a W3C datetime into a sortable timestamp (0 when unknown)."""
+    if not lastmod:
+        return 0.0
+    try:
+        parsed = datetime.fromisoformat(lastmod.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class SitemapDiscovery:
+    """Discover a site's pages from robots.txt and its XML sitemaps."""
+
+    def __init__(self, base_url: str, user_agent: str = '*', max_sitemaps: int = 50):
+        self.base_url = base_url
+        self.user_agent = user_agent
+        self.max_sitemaps = max_sitemaps
+        self.robots: Optional[RobotFileParser] = None
+
+    def _site_root(self) -> str:
+        parts = urlsplit(self.base_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    async def _fetch(self, request, url: str) -> Optional[str]:
+        """Fetch a URL with a Playwright APIRequestContext, returning text or None."""
+        try:
+            response = await request.get(url, timeout=15000)
+            if not response.ok:
+                return None
+            body = await response.body()
+            if body[:2] == b'\x1f\x8b':
+                body = gzip.decompress(body)
+            return body.decode('utf-8', errors='replace')
+        except Exception as e:
+            logger.warning(f"Could not fetch {url}: {e}")
+            return None
+
+    async def _load_robots(self, request) -> List[str]:
+        """Load robots.txt rules and return the sitemaps it declares."""
+        self.robots = RobotFileParser()
+        text = await self._fetch(request, self._site_root() + '/robots.txt')
+        self.robots.parse(text.splitlines() if text else [])
+        return self.robots.site_maps() or []
+
+    def can_fetch(self, url: str) -> bool:
+        """Check robots.txt rules for a URL (allowed until robots.txt is loaded)."""
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(self.user_agent, url)
+
+    def _parse_sitemap(self, text: str) -> Dict[str, List]:
+        """Parse a sitemap or sitemap index into child sitemaps and page entries."""
+        result = {'sitemaps': [], 'pages': []}
+        try:
+            root = ET.fromstring(text)
+        except ET.ParseError as e:
+            logger.warning(f"Invalid sitemap XML: {e}")
+            return result
+
+        kind = _local_name(root.tag)
+        for entry in root:
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in entry}
+            if not fields.get('loc'):
+                continue
+            if kind == 'sitemapindex':
+                result['sitemaps'].append(fields['loc'])
+            elif kind == 'urlset':
+                result['pages'].append({
+                    'url': fields['loc'],
+                    'lastmod': fields.get('lastmod') or None
+                })
+        return result
+
+    async def discover(self, request) -> List[Dict]:
+        """
+        Load robots.txt and walk all sitemaps.
+        Returns page entries ({'url', 'lastmod'}) ordered most recently modified first.
+        """
+        pending = await self._load_robots(request)
+        if not pending:
+            pending = [urljoin(self._site_root(), path) for path in FALLBACK_SITEMAPS]
+            stop_after_first = True
+        else:
+            stop_after_first = False
+
+        seen = set()
+        pages: Dict[str, Dict] = {}
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            text = await self._fetch(request, sitemap_url)
+            if not text:
+                continue
+
+            parsed = self._parse_sitemap(text)
+            for page in parsed['pages']:
+                pages[page['url']] = page
+            if stop_after_first:
+                # Only the first fallback location that exists is used
+                pending = []
+                stop_after_first = False
+            pending.extend(parsed['sitemaps'])
+
+        entries = sorted(pages.values(), key=lambda p: _lastmod_timestamp(p['lastmod']), reverse=True)
+        logger.info(f"Discovered {len(entries)} pages from {len(seen)} sitemap(s)")
+        return entries
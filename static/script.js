@@ -1,5 +1,16 @@
 let ws = null;
 
+// Chat sessions are kept server side under this id, so a reconnect to any
+// server worker continues the same conversation
+function getSessionId() {
+    let sessionId = sessionStorage.getItem('chatSessionId');
+    if (!sessionId) {
+        sessionId = crypto.randomUUID();
+        sessionStorage.setItem('chatSessionId', sessionId);
+    }
+    return sessionId;
+}
+
 function showLoading() {
     document.getElementById('loadingOverlay').style.display = 'flex';
 }
@@ -52,10 +63,15 @@ async function initializeChatbot() {
 }
 
 function initializeWebSocket() {
-    ws = new WebSocket(`ws://${window.location.host}/chat`);
+    ws = new WebSocket(`ws://${window.location.host}/chat?session_id=${encodeURIComponent(getSessionId())}`);
 
     ws.onmessage = function(event) {
         const response = JSON.parse(event.data);
+        if (response.cancelled) {
+            // The server dropped the previous question in favour of a newer one
+            displayMessage('Skipped this question to answer your newer one.', 'system');
+            return;
+        }
         displayMessage(response.answer, 'bot', response.sources);
     };
 
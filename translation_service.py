@@ -1,16 +1,35 @@
-from deep_translator import GoogleTranslator
-from indic_transliteration import sanscript
-from indic_transliteration.sanscript import transliterate
+import asyncio
 import logging
 from typing import Tuple
+from shared_store import SharedStore
+import hashlib
 import re
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _google_translator(source: str, target: str):
+    # deep_translator pulls in BeautifulSoup and lxml, so it is imported on
+    # the first translation rather than at process start
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source=source, target=target)
+
+async def _google_translate(text: str, source: str, target: str) -> str:
+    """
+    Run a blocking deep_translator call in a worker thread so it does not
+    stall the event loop. A cancelled caller stops waiting immediately; the
+    thread's result is discarded.
+    """
+    return await asyncio.to_thread(
+        lambda: _google_translator(source=source, target=target).translate(text)
+    )
+
 class TranslationService:
-    def __init__(self):
+    def __init__(self, cache: SharedStore = None, cache_ttl: float = 7 * 24 * 3600):
         self.supported_languages = ['en', 'ml']
+        # Optional cache shared across workers for translation results
+        self.cache = cache
+        self.cache_ttl = cache_ttl
         # Common Manglish patterns
         self.manglish_patterns = [
             r'\b(aa|ee|oo|mm|nn|th|zh|ch|ll|rr|tt)\b',
@@ -66,6 +85,22 @@ class TranslationService:
         return manglish
 
     async def translate_text(self, text: str, target_lang: str = 'en') -> Tuple[str, str]:
+        """Translate text between English and Malayalam, using the shared cache if set."""
+        if not self.cache:
+            return await self._translate(text, target_lang)
+        
+        key = f"{target_lang}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+        cached = await asyncio.to_thread(self.cache.get, 'translation', key)
+        if cached:
+            return cached[0], cached[1]
+        
+        translated, source_lang = await self._translate(text, target_lang)
+        if translated != text or source_lang == target_lang:
+            await asyncio.to_thread(self.cache.set, 'translation', key, [translated, source_lang],
+                                    ttl=self.cache_ttl)
+        return translated, source_lang
+
+    async def _translate(self, text: str, target_lang: str) -> Tuple[str, str]:
         """Translate text between English and Malayalam."""
         try:
             source_lang = self.detect_language(text)
@@ -77,22 +112,20 @@ class TranslationService:
             # Handle Manglish input
             if source_lang == 'manglish':
                 # First translate to English
-                translator = GoogleTranslator(source='en', target='en')
-                english_text = translator.translate(text)
+                english_text = await _google_translate(text, source='en', target='en')
                 
                 if target_lang == 'en':
                     return english_text, source_lang
                 else:
                     # Then to Malayalam if needed
-                    translator = GoogleTranslator(source='en', target='ml')
-                    return translator.translate(english_text), source_lang
+                    return await _google_translate(english_text, source='en', target='ml'), source_lang
             
             # Regular translation
-            translator = GoogleTranslator(
+            translated = await _google_translate(
+                text,
                 source='ml' if source_lang == 'ml' else 'en',
                 target='ml' if target_lang == 'ml' else 'en'
             )
-            translated = translator.translate(text)
             logger.info(f"Translated text: {translated}")
             return translated, source_lang
             
@@ -130,7 +163,7 @@ class TranslationService:
         try:
             if to_malayalam:
                 # Convert Manglish to Malayalam
-                translator = GoogleTranslator(source='en', target='ml')
+                translator = _google_translator(source='en', target='ml')
                 return translator.translate(text)
             else:
                 # Convert Malayalam to Manglish
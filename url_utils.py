@@ -0,0 +1,62 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Optional
+import posixpath
+import re
+
+# Query parameters that only track the visitor and never change page content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+def _strip_www(host: str) -> str:
+    return host[4:] if host.startswith('www.') else host
+
+def canonicalize_url(url: str, base_url: Optional[str] = None, trailing_slash: bool = True) -> str:
+    """
+    Normalize a URL so that variants of the same page dedupe to one key.
+    The result is meant for comparing URLs; crawlers should keep fetching
+    the URL as linked, since not every server accepts the normalized form.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    query parameters, sorts the remaining parameters and resolves dot
+    segments. When base_url is given, http/https and www/non-www variants of
+    the base host are rewritten to the base URL's form. With trailing_slash,
+    extensionless paths get a trailing slash (the WordPress permalink form).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = str(parts.port) if parts.port else ''
+
+    if base_url:
+        base = urlsplit(base_url)
+        base_host = (base.hostname or '').lower()
+        if host and _strip_www(host) == _strip_www(base_host):
+            host = base_host
+            if scheme in DEFAULT_PORTS and port in ('', DEFAULT_PORTS[scheme]):
+                scheme = base.scheme.lower()
+                port = str(base.port) if base.port else ''
+
+    if port and DEFAULT_PORTS.get(scheme) == port:
+        port = ''
+    netloc = f"{host}:{port}" if port else host
+
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    normalized = posixpath.normpath(path)
+    if path.endswith('/') and normalized != '/':
+        normalized += '/'
+    path = normalized
+    if trailing_slash and not path.endswith('/') and '.' not in path.rsplit('/', 1)[-1]:
+        path += '/'
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query_string = urlencode(sorted(query))
+
+    return urlunsplit((scheme, netloc, path, query_string, ''))
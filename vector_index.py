@@ -0,0 +1,219 @@
+from langchain.vectorstores.base import VectorStore
+from langchain.vectorstores.utils import maximal_marginal_relevance
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+from typing import Any, Iterable, List, Dict, Optional, Tuple
+import numpy as np
+import logging
+import shutil
+import json
+import time
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MmapVectorStore(VectorStore):
+    """
+    Read-only vector store over a float32 matrix, typically memory-mapped from
+    disk so that every serving process shares the same pages.
+    Vectors are stored L2-normalized, so cosine similarity is a dot product.
+    """
+
+    def __init__(self, embedding: Embeddings, vectors: np.ndarray,
+                 texts: List[str], metadatas: List[Dict], version: str = '',
+                 entities: Optional[Dict] = None):
+        self.embedding = embedding
+        self.vectors = vectors
+        self.texts = texts
+        self.metadatas = metadatas
+        self.version = version
+        # Entity catalog built alongside the vectors (see entity_index.EntityIndex)
+        self.entities = entities or {}
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  **kwargs: Any) -> List[str]:
+        raise NotImplementedError("MmapVectorStore is read-only; build a new index version instead")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings,
+                   metadatas: Optional[List[dict]] = None, **kwargs: Any) -> 'MmapVectorStore':
+        """Embed texts into an in-memory store."""
+        vectors = normalize(np.array(embedding.embed_documents(texts), dtype=np.float32))
+        return cls(embedding, vectors, list(texts), metadatas or [{} for _ in texts])
+
+    def _document(self, index: int) -> Document:
+        return Document(page_content=self.texts[index], metadata=dict(self.metadatas[index]))
+
+    def _scores(self, query_vector: np.ndarray) -> np.ndarray:
+        query = normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        return self.vectors @ query
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        if not self.texts:
+            return []
+        scores = self._scores(np.array(embedding))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._document(i), float(scores[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4,
+                                                fetch_k: int = 20, lambda_mult: float = 0.5,
+                                                **kwargs: Any) -> List[Document]:
+        if not self.texts:
+            return []
+        scores = self._scores(np.array(embedding))
+        fetch_k = min(fetch_k, len(scores))
+        candidates = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        selected = maximal_marginal_relevance(
+            np.array(embedding, dtype=np.float32),
+            [self.vectors[i] for i in candidates],
+            lambda_mult=lambda_mult,
+            k=k
+        )
+        return [self._document(candidates[i]) for i in selected]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k, fetch_k, lambda_mult
+        )
+
+    # Async searches embed the query with the async client, so cancelling a
+    # chat turn also cancels its outbound embedding request
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(await self.embedding.aembed_query(query), k)
+
+    async def amax_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                             lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            await self.embedding.aembed_query(query), k, fetch_k, lambda_mult
+        )
+
+def query_embedding_for(embedding: Embeddings, config: Dict) -> Embeddings:
+    """
+    Queries must be embedded with the model the index was built with. If the
+    configured model differs, use a copy of the client set to the index's model.
+    """
+    built_with = config.get('embedding_model')
+    current = getattr(embedding, 'model', None)
+    if not built_with or not current or built_with == current:
+        return embedding
+    logger.warning(f"Index was built with {built_with} but {current} is configured; "
+                   f"embedding queries with {built_with}")
+    return embedding.copy(update={'model': built_with})
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+class SharedIndex:
+    """
+    Versioned on-disk index shared by all serving workers.
+
+    Each build is written to its own directory under versions/ and published
+    by atomically replacing the CURRENT pointer file. Workers open the current
+    version read-only with memory mapping and call refresh() to pick up a new
+    version, so rebuilds swap in without downtime.
+    """
+
+    def __init__(self, directory: str, embedding: Embeddings,
+                 keep_versions: int = 3, check_interval: float = 2.0):
+        self.directory = directory
+        self.embedding = embedding
+        self.keep_versions = keep_versions
+        self.check_interval = check_interval
+        self.versions_dir = os.path.join(directory, "versions")
+        self.pointer_path = os.path.join(directory, "CURRENT")
+        self.store: Optional[MmapVectorStore] = None
+        self._last_check = 0.0
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self.pointer_path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, texts: List[str], metadatas: List[Dict], vectors: np.ndarray,
+                info: Optional[Dict] = None, entities: Optional[Dict] = None,
+                manifest: Optional[List[Dict]] = None) -> str:
+        """Write a new index version and make it current."""
+        now = time.time()
+        version = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(now))}-{int(now * 1000) % 1000:03d}-{os.getpid()}"
+        version_dir = os.path.join(self.versions_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        np.save(os.path.join(version_dir, "vectors.npy"), normalize(np.asarray(vectors, dtype=np.float32)))
+        with open(os.path.join(version_dir, "chunks.json"), 'w', encoding='utf-8') as f:
+            json.dump({'texts': texts, 'metadatas': metadatas, 'info': info or {},
+                       'entities': entities or {}, 'manifest': manifest or []},
+                      f, ensure_ascii=False)
+
+        tmp_path = self.pointer_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.pointer_path)
+        logger.info(f"Published index version {version} ({len(texts)} chunks)")
+
+        self._prune()
+        return version
+
+    def _prune(self) -> None:
+        """Remove old versions; open memory maps stay valid after unlink."""
+        versions = sorted(os.listdir(self.versions_dir))
+        current = self.current_version()
+        for version in versions[:-self.keep_versions]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.versions_dir, version), ignore_errors=True)
+
+    def load(self, version: Optional[str] = None) -> Optional[MmapVectorStore]:
+        """Open an index version (the current one by default) read-only."""
+        version = version or self.current_version()
+        if not version:
+            return None
+        version_dir = os.path.join(self.versions_dir, version)
+        vectors = np.load(os.path.join(version_dir, "vectors.npy"), mmap_mode='r')
+        with open(os.path.join(version_dir, "chunks.json"), 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        embedding = query_embedding_for(self.embedding, chunks.get('info', {}))
+        self.store = MmapVectorStore(embedding, vectors, chunks['texts'], chunks['metadatas'], version,
+                                     entities=chunks.get('entities'))
+        self._last_check = time.monotonic()
+        logger.info(f"Loaded index version {version} ({len(chunks['texts'])} chunks)")
+        return self.store
+
+    def refresh(self) -> bool:
+        """Swap to a newly published version if there is one. Returns True if swapped."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        version = self.current_version()
+        if not version or (self.store and self.store.version == version):
+            return False
+        self.load(version)
+        return True